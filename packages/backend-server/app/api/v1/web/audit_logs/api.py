@@ -15,7 +15,7 @@ async def get_audit_logs_api(
     request: Request,
     user: UserDetails = Depends(get_current_user),
 ):
-    return get_audit_logs(user.get("db"), payload.model_dump(), request)
+    return await get_audit_logs(user.get("db"), payload.model_dump(), request)
 
 
 @router.get(AUDIT_LOG_ACTIONS)
@@ -1,6 +1,9 @@
-from pydantic import BaseModel
+from typing import Optional
+
+from pydantic import BaseModel, Field
 
 
 class AuditLogList(BaseModel):
-    page: int
-    limit: int
+    page: int = Field(1, ge=1)
+    limit: int = Field(10, ge=1, le=100)
+    cursor: Optional[str] = None
@@ -6,8 +6,14 @@ from app.managers.collection_names import (
     WALLET_PHRASE,
     WORKSPACE,
 )
-from app.utils.utils import create_uuid, response_helper
+from app.utils.utils import (
+    create_uuid,
+    response_helper,
+    accepts_ndjson,
+    ndjson_response,
+)
 from app.utils.i8ns import translate
+from app.framework.mongo_db.pagination import InvalidCursor
 
 
 def get_audit_log_actions():
@@ -25,15 +31,30 @@ def get_audit_log_actions():
     )
 
 
-def get_audit_logs(db, payload, request):
+async def get_audit_logs(db, payload, request):
     """Fetch paginated audit logs for a workspace."""
     query = {"workspace_id": request.path_params.get("workspace_id")}
-    sort = [("created_at", -1)]
+    if accepts_ndjson(request):
+        return ndjson_response(
+            audit_log_manager.find_iter(
+                db, query, sort=[("created_at", -1), ("doc_id", -1)]
+            )
+        )
+
     page = payload.get("page", 1)
     limit = payload.get("limit", 10)
-    skip = (page - 1) * limit
-    total = audit_log_manager.count_documents(db, query)
-    data = audit_log_manager.find(db, query, sort=sort, skip=skip, limit=limit)
+    total = await audit_log_manager.count_documents(db, query)
+    try:
+        data, next_cursor = await audit_log_manager.find_page(
+            db,
+            query,
+            sort_key="created_at",
+            limit=limit,
+            cursor=payload.get("cursor"),
+            skip=(page - 1) * limit,
+        )
+    except InvalidCursor:
+        return response_helper(400, translate("pagination.invalid_cursor"))
     return response_helper(
         200,
         translate("audit_logs.audit_logs_fetched"),
@@ -41,15 +62,18 @@ def get_audit_logs(db, payload, request):
         page=page,
         limit=limit,
         count=total,
+        next_cursor=next_cursor,
     )
 
 
-def get_audit_log_count(db, query):
+async def get_audit_log_count(db, query):
     """Return the count of audit logs matching the query."""
-    return audit_log_manager.count_documents(db, query)
+    return await audit_log_manager.count_documents(db, query)
 
 
-def add_audit_log(db, collection_name, action, record_id, created_by, request=None):
+async def add_audit_log(
+    db, collection_name, action, record_id, created_by, request=None
+):
     """Add a new audit log entry to the database."""
     audit_log = {
         "event": f"{collection_name}.{action}",
@@ -63,4 +87,4 @@ def add_audit_log(db, collection_name, action, record_id, created_by, request=No
         "workspace_id": request.path_params.get("workspace_id") if request else None,
         "project_id": request.path_params.get("project_id") if request else None,
     }
-    audit_log_manager.insert_one(db, audit_log)
+    await audit_log_manager.insert_buffered(db, audit_log)
@@ -1,7 +1,11 @@
 from fastapi import APIRouter, Request, BackgroundTasks, Response, Depends
 from app.api.v1.web.auth.schema import Login, UserDetails, TwoFactorAuth, UpdateKeys
 from app.api.v1.web.auth.services import validate_stack_auth_token
-from app.framework.permission_services.service import get_current_user
+from app.framework.permission_services.service import (
+    get_current_user,
+    invalidate_token,
+    invalidate_user,
+)
 from app.utils.i8ns import translate
 from app.api.v1.web.auth.services import (
     create_user,
@@ -21,7 +25,6 @@ from app.api.v1.web.route_constants import (
     UPDATE_KEYS,
 )
 
-db = get_db()
 router = APIRouter()
 
 
@@ -32,27 +35,30 @@ async def login_api(
     back_ground_tasks: BackgroundTasks,
     response: Response,
 ):
+    db = get_db()
     payload = payload.model_dump()
-    auth_data = validate_stack_auth_token(payload.get("uid"))
+    auth_data = await validate_stack_auth_token(payload.get("uid"))
     if not auth_data:
         return response_helper(400, translate("auth.authentication_failed"))
-    user = user_manager.find_one(
+    user = await user_manager.find_one(
         db, {"uid": auth_data.get("id"), "access": {"$ne": False}}, {"_id": False}
     )
 
     if not user:
-        return create_user(request, db, auth_data, back_ground_tasks)
+        return await create_user(request, db, auth_data, back_ground_tasks)
 
-    return user_login(db, user)
+    return await user_login(db, user)
 
 
 @router.post(LOGOUT)
 async def logout_api(
     request: Request, response: Response, user: UserDetails = Depends(get_current_user)
 ):
-    user_manager.update_one(
-        db, {"user_id": user.get("user_id")}, {"$set": {"token": None}}
+    await user_manager.update_one(
+        user.get("db"), {"user_id": user.get("user_id")}, {"$set": {"token": None}}
     )
+    invalidate_user(user.get("user_id"))
+    invalidate_token(request.headers.get("access-token"))
     response.delete_cookie(key="access_token")
     response.delete_cookie(key="refresh_token")
     return response_helper(200, translate("auth.user_logged_out"))
@@ -66,14 +72,14 @@ async def two_factor_auth_api(
     payload: TwoFactorAuth,
     back_ground_tasks: BackgroundTasks,
 ):
-    return verify_two_factor_auth(
-        request, db, payload.model_dump(), response, back_ground_tasks
+    return await verify_two_factor_auth(
+        request, get_db(), payload.model_dump(), response, back_ground_tasks
     )
 
 
 @router.get(GET_KEYS)
 async def get_keys_api(user: UserDetails = Depends(get_current_user)):
-    return get_keys(db, user.get("user_id"))
+    return await get_keys(user.get("db"), user.get("user_id"))
 
 
 @router.post(UPDATE_KEYS)
@@ -83,4 +89,6 @@ async def update_keys_api(
     background_tasks: BackgroundTasks,
     user: UserDetails = Depends(get_current_user),
 ):
-    return update_keys(db, user, payload.model_dump(), background_tasks)
+    return await update_keys(
+        user.get("db"), user, payload.model_dump(), background_tasks
+    )
@@ -1,5 +1,6 @@
-import requests
-from user_agents import parse
+import hashlib
+
+import httpx
 from pyotp import random_base32
 import pyotp
 from cryptography.fernet import Fernet
@@ -17,6 +18,16 @@ from app.utils.utils import (
 )
 from app.utils.jwt_utils import encode_token
 from app.utils.i8ns import translate
+from app.framework.permission_services.service import invalidate_user
+from app.framework.stack_auth import client as stack_auth_client
+from app.utils.cache import TTLCache
+from app.utils.user_agent import login_activity_fields
+
+# Validated Stack Auth token digest -> user payload, so retried or repeated
+# logins with the same token skip the provider round trip.
+stack_auth_cache = TTLCache(
+    maxsize=settings.STACK_AUTH_CACHE_SIZE, ttl=settings.STACK_AUTH_CACHE_TTL_SECONDS
+)
 
 
 def encrypt_totp_secret(totp_secret):
@@ -38,54 +49,48 @@ def create_profision_uri(totp_secret, email):
     return provisioning_uri
 
 
-def validate_stack_auth_token(token):
-    endpoint = "https://api.stack-auth.com/api/v1/users/me"
+async def validate_stack_auth_token(token):
+    if not token:
+        return None
+    digest = hashlib.sha256(token.encode()).digest()
+    auth_data = stack_auth_cache.get(digest)
+    if auth_data is not None:
+        return auth_data
 
     try:
-        res = requests.request(
-            "GET",
-            endpoint,
-            headers={
-                "x-stack-access-type": "server",
-                "x-stack-project-id": settings.STACK_AUTH_PROJECT_ID,
-                "x-stack-publishable-client-key": settings.STACK_AUTH_CLIENT_ID,
-                "x-stack-secret-server-key": settings.STACK_AUTH_CLIENT_SECRET,
-                "x-stack-access-token": token,
-            },
+        res = await stack_auth_client.get_client().get(
+            "/api/v1/users/me", headers={"x-stack-access-token": token}
         )
         if res.status_code >= 400:
             return None
-        return res.json()
-    except Exception:
+        auth_data = res.json()
+    except (httpx.HTTPError, ValueError):
         return None
 
+    stack_auth_cache.set(digest, auth_data)
+    return auth_data
 
-def record_login_event(request, db, user):
-    # Get IP Address
-    client_ip = request.client.host
+
+def get_client_ip(request):
     if "x-forwarded-for" in request.headers:
-        client_ip = request.headers["x-forwarded-for"].split(",")[0]
+        return request.headers["x-forwarded-for"].split(",")[0]
+    return request.client.host
+
 
-    user_agent = request.headers.get("user-agent")
-    ua = parse(user_agent)
+async def record_login_event(db, user_id, client_ip, user_agent):
+    """Store a login event; runs as a background task after the response."""
     data = {
+        "doc_id": create_uuid(),
         "ip_address": client_ip,
-        "created_by": user.get("user_id"),
+        "created_by": user_id,
         "created_at": create_timestamp(),
         "user_agent": user_agent,
-        "browser": ua.browser.family,
-        "os": f"{ua.os.family} {ua.os.version_string}",
-        "device": {
-            "type": ua.device.family,
-            "is_mobile": ua.is_mobile,
-            "is_tablet": ua.is_tablet,
-            "is_pc": ua.is_pc,
-        },
+        **login_activity_fields(user_agent),
     }
-    login_activity_manager.insert_one(db, data)
+    await login_activity_manager.insert_buffered(db, data)
 
 
-def create_user(request, db, auth_data, back_ground_tasks):
+async def create_user(request, db, auth_data, back_ground_tasks):
     user_id = create_uuid()
     totp_secret = random_base32()
     workspace_id = create_uuid()
@@ -112,7 +117,7 @@ def create_user(request, db, auth_data, back_ground_tasks):
             "totp_secret": encrypt_totp_secret(totp_secret),
         },
     }
-    user_manager.insert_one(db, new_user_data)
+    await user_manager.insert_one(db, new_user_data)
     back_ground_tasks.add_task(
         create_initial_workspace_on_signup, db, request, user_id, workspace_id
     )
@@ -128,7 +133,7 @@ def create_user(request, db, auth_data, back_ground_tasks):
     return response_helper(200, translate("auth.user_signed_up"), data=data)
 
 
-def user_login(db, user):
+async def user_login(db, user):
     data = {
         "user_id": user.get("user_id"),
         "language": user.get("language", "en"),
@@ -138,16 +143,17 @@ def user_login(db, user):
         totp_secret = random_base32()
         data["provisioning_uri"] = create_profision_uri(totp_secret, user.get("email"))
         data["is_new_user"] = True
-        user_manager.update_one(
+        await user_manager.update_one(
             db,
             {"user_id": user.get("user_id")},
             {"$set": {"2fa": {"totp_secret": encrypt_totp_secret(totp_secret)}}},
         )
+        invalidate_user(user.get("user_id"))
     return response_helper(200, translate("auth.user_logged_in"), data=data)
 
 
-def verify_two_factor_auth(request, db, payload, response, back_ground_tasks):
-    user = user_manager.find_one(db, {"user_id": payload.get("user_id")})
+async def verify_two_factor_auth(request, db, payload, response, back_ground_tasks):
+    user = await user_manager.find_one(db, {"user_id": payload.get("user_id")})
 
     if not user:
         return response_helper(400, "User details not found")
@@ -159,9 +165,16 @@ def verify_two_factor_auth(request, db, payload, response, back_ground_tasks):
     token = create_jwt_token({"user": user.get("user_id")})
     refresh_token = encode_token(user.get("user_id"))
 
-    back_ground_tasks.add_task(record_login_event, request, db, user)
+    # Only capture the raw request fields here; parsing happens in the task.
+    back_ground_tasks.add_task(
+        record_login_event,
+        db,
+        user.get("user_id"),
+        get_client_ip(request),
+        request.headers.get("user-agent"),
+    )
 
-    user_manager.update_one(
+    await user_manager.update_one(
         db,
         {"user_id": user.get("user_id")},
         {
@@ -176,6 +189,7 @@ def verify_two_factor_auth(request, db, payload, response, back_ground_tasks):
             }
         },
     )
+    invalidate_user(user.get("user_id"))
 
     response.set_cookie(
         key="access_token", value=token, httponly=True, secure=True, samesite="strict"
@@ -192,14 +206,14 @@ def verify_two_factor_auth(request, db, payload, response, back_ground_tasks):
         "language": "en",
         "token": token,
         "refresh_token": refresh_token,
-        "plan":user.get("plan")
+        "plan": user.get("plan"),
     }
     return response_helper(200, translate("auth.two_factor_auth_verified"), data=data)
 
 
-def get_keys(db, user_id):
-    user_key = user_keys_manager.get_private_key(db, user_id)
-    user_public_key = user_keys_manager.get_public_key(db, user_id)
+async def get_keys(db, user_id):
+    user_key = await user_keys_manager.get_private_key(db, user_id)
+    user_public_key = await user_keys_manager.get_public_key(db, user_id)
     return response_helper(
         200,
         translate("auth.keys_fetched"),
@@ -207,15 +221,14 @@ def get_keys(db, user_id):
     )
 
 
-def update_keys(db, user, payload, background_tasks):
+async def update_keys(db, user, payload, background_tasks):
     data = {
         "user_id": user.get("user_id"),
         "public_key": payload.get("public_key"),
         "private_key": payload.get("private_key"),
     }
-    if user_keys_manager.find_one(db, {"user_id": user.get("user_id")}):
+    if await user_keys_manager.find_one(db, {"user_id": user.get("user_id")}):
         return response_helper(400, translate("auth.keys_already_exist"))
-    user_keys_manager.insert_one(db, data)
+    await user_keys_manager.insert_one(db, data)
     # background_tasks.add_task(send_welcome_email, db, user)
     return response_helper(200, translate("auth.keys_updated"))
-
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Query
 from app.api.v1.web.dashboard.services import (
     get_dashboard_overview,
     get_dashboard_recent_activity,
@@ -28,6 +28,10 @@ async def get_dashboard_recent_activity_api(
     request: Request,
     workspace_id: str,
     project_id: str,
+    limit: int = Query(20, description="Items per page", ge=1, le=100),
+    cursor: str = Query(None, description="Cursor from the previous page"),
     user: UserDetails = Depends(get_current_user),
 ):
-    return await get_dashboard_recent_activity(request, user)
+    return await get_dashboard_recent_activity(
+        request, user, limit=limit, cursor=cursor
+    )
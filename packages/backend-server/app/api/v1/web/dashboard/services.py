@@ -1,38 +1,78 @@
 from app.utils.utils import response_helper
 from app.managers import (
-    secrets as secret_manager,
     project as project_manager,
     project_activity as project_activity_manager,
 )
+from app.managers.collection_names import SECRET
+from app.managers.secret_counts import count_secrets
 from app.utils.i8ns import translate
+from app.framework.mongo_db.pagination import InvalidCursor
 
 
 async def get_dashboard_overview(request, user):
     db = user.get("db")
     project_id = request.path_params.get("project_id")
-    project_details = project_manager.find_one(db, {"doc_id": project_id})
+    project_details = await project_manager.find_one(db, {"doc_id": project_id})
     if not project_details:
         return response_helper(404, "Project not found")
 
     features = project_details.get("features", {})
+    secret_counts = project_details.get("secret_counts")
+    if secret_counts is None:
+        # Projects that predate the counters: count once, then keep them current.
+        secret_counts = (await count_secrets(db, project_id)).get(project_id, {})
+        await project_manager.init_secret_counts(db, project_id, secret_counts)
 
-    data = {}
-    for key, value in features.items():
-        print(key, value.get("enabled"))
-        if value.get("enabled"):
-            data[key] = secret_manager.get_project_secrets_count(db, key, project_id)
+    data = {
+        key: secret_counts.get(key, 0)
+        for key, value in features.items()
+        if value.get("enabled")
+    }
 
     return response_helper(200, translate("dashboard.overview"), data)
 
 
-async def get_dashboard_recent_activity(request, user):
+# Join the title of the live secret each activity row points at.
+SECRET_TITLE_LOOKUP = [
+    {
+        "$lookup": {
+            "from": SECRET,
+            "localField": "record_id",
+            "foreignField": "doc_id",
+            "pipeline": [
+                {"$match": {"access": {"$ne": False}}},
+                {"$project": {"_id": False, "title": True}},
+            ],
+            "as": "secret",
+        }
+    },
+    {"$set": {"title": {"$ifNull": [{"$first": "$secret.title"}, None]}}},
+    {"$unset": "secret"},
+]
+
+
+async def get_dashboard_recent_activity(request, user, limit=20, cursor=None):
     db = user.get("db")
     project_id = request.path_params.get("project_id")
-    project_details = project_manager.find_one(db, {"doc_id": project_id})
+    project_details = await project_manager.find_one(db, {"doc_id": project_id})
     if not project_details:
         return response_helper(404, "Project not found")
 
-    data = project_activity_manager.find(db, {"project_id": project_id})
-    for item in data:
-        item["title"] = secret_manager.get_title(db, item.get("record_id"))
-    return response_helper(200, translate("dashboard.recent_activity"), data)
+    try:
+        data, next_cursor = await project_activity_manager.aggregate_page(
+            db,
+            {"project_id": project_id},
+            SECRET_TITLE_LOOKUP,
+            sort_key="created_at",
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidCursor:
+        return response_helper(400, translate("pagination.invalid_cursor"))
+    return response_helper(
+        200,
+        translate("dashboard.recent_activity"),
+        data,
+        limit=limit,
+        next_cursor=next_cursor,
+    )
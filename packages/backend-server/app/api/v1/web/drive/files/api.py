@@ -2,7 +2,7 @@ from fastapi import APIRouter,Request,Depends,UploadFile
 from app.api.v1.web.drive.files.schema import RenameFile, MoveFile, DeleteFiles, GetPresignedUrl
 from app.api.v1.web.auth.schema import UserDetails
 from app.framework.permission_services.service import get_current_user
-from app.api.v1.web.drive.files.services import rename_file, get_presigned_url, delete_files, move_files
+from app.api.v1.web.drive.files.services import rename_file, get_presigned_url, delete_files, move_files, get_download_redirect
 
 router = APIRouter()
 
@@ -12,6 +12,10 @@ FILE_URL ="/file"
 async def get_presigned_url_api(payload: GetPresignedUrl, user: UserDetails = Depends(get_current_user)):
     return await get_presigned_url(user, payload.model_dump())
 
+@router.get(FILE_URL+"/{file_id}/download")
+async def download_file_api(file_id: str, redirect: bool = True, user: UserDetails = Depends(get_current_user)):
+    return await get_download_redirect(user, file_id, redirect)
+
 @router.post(FILE_URL+"/rename")
 async def rename_file_api(payload: RenameFile, user: UserDetails = Depends(get_current_user)):
     return await rename_file(user, payload.model_dump())
@@ -3,36 +3,72 @@ from app.managers.collection_names import FILES, FOLDERS
 from app.utils.utils import response_helper, create_uuid, get_file_extension, get_folders_from_path, create_timestamp
 from app.utils.i8ns import translate
 from app.utils.s3_utils import generate_upload_url, generate_download_url
+from app.utils.cache import TTLCache
+from app.core.config import settings
+from fastapi.responses import RedirectResponse
+import time
+from pymongo.errors import DuplicateKeyError
 
+# Per-worker signed download URLs keyed by object key; see get_download_url.
+download_url_cache = TTLCache(maxsize=settings.DRIVE_DOWNLOAD_URL_CACHE_SIZE, ttl=settings.DRIVE_DOWNLOAD_URL_WINDOW_SECONDS)
 
 
-def get_files_list(user, parent_id=None):
+
+async def name_taken(db, collection_name, user_id, parent_id, lower_name, doc_id=None):
+    """Check for a duplicate name before a write, until the unique index guards names."""
+    if db_manager.unique_names_enforced(collection_name):
+        return False
+    query = {"created_by": user_id, "parent_id": parent_id, "lower_name": lower_name}
+    if doc_id:
+        query["doc_id"] = {"$ne": doc_id}
+    return await db_manager.find_one(db, collection_name, query) is not None
+
+
+async def get_files_list(user, parent_id=None, projection=None):
     db = user.get("db")
     query = {"created_by": user.get("user_id")}
     if parent_id:
         query["parent_id"] = parent_id
-    files = db_manager.find(db, FILES, query)
-    for file in files:
-        file["file_url"]= generate_download_url(file.get("key"), 360000)
-    return files 
+    return await db_manager.find(db, FILES, query, projection)
+
+
+def get_download_url(key):
+    """Return a signed download URL, reusing one signed earlier in the same window.
+
+    Time is split into DRIVE_DOWNLOAD_URL_WINDOW_SECONDS windows. A URL is cached
+    until its window ends and signed to stay valid for one more full window, so
+    every URL handed out has at least that long left.
+    """
+    url = download_url_cache.get(key)
+    if url:
+        return url
+    window = settings.DRIVE_DOWNLOAD_URL_WINDOW_SECONDS
+    remaining = int(window - time.time() % window) or window
+    url = generate_download_url(key, remaining + window)
+    if url:
+        download_url_cache.set(key, url, ttl=remaining)
+    return url
+
+
+async def get_download_redirect(user, file_id, redirect=True):
+    db = user.get("db")
+    file = await db_manager.find_one(db, FILES, {"doc_id": file_id, "created_by": user.get("user_id")}, {"_id": False, "key": True})
+    if not file or not file.get("key"):
+        return response_helper(404, translate("drive.files.not_found"))
+
+    url = get_download_url(file.get("key"))
+    if not url:
+        return response_helper(502, translate("drive.files.download_failed"))
+    if not redirect:
+        # For clients that fetch the bytes themselves, e.g. to decrypt them.
+        return response_helper(200, translate("drive.files.download_url"), data={"download_url": url})
+    return RedirectResponse(url, status_code=302)
 
 async def get_presigned_url(user, payload):
     db = user.get("db")
     user_id = user.get("user_id")
     file_name = payload.get("name")
     
-    # Check if file already exists for this user
-    query = {
-        "lower_name": file_name.strip().lower(),
-        "created_by": user_id
-    }
-    if payload.get("parent_id"):
-        query["parent_id"] = payload.get("parent_id")
-    
-    file = db_manager.find_one(db, FILES, query)
-    if file:
-        return response_helper(400, translate("drive.files.already_exists"))
-    
     # Generate file paths
     file_id = create_uuid()
     file_extension = get_file_extension(file_name)
@@ -51,7 +87,7 @@ async def get_presigned_url(user, payload):
         if parent_id:
             query["parent_id"] = parent_id
         
-        folder_details = db_manager.find_one(db, FOLDERS, query)
+        folder_details = await db_manager.find_one(db, FOLDERS, query)
         if not folder_details:
             # Create new folder
             folder_data = {
@@ -61,13 +97,22 @@ async def get_presigned_url(user, payload):
                 "created_by": user_id,
                 "lower_name": folder_name.strip().lower(),
             }
-            db_manager.insert_one(db, FOLDERS, folder_data)
-            parent_id = folder_data.get("doc_id")
+            try:
+                await db_manager.insert_one(db, FOLDERS, folder_data)
+                parent_id = folder_data.get("doc_id")
+            except DuplicateKeyError:
+                # Created by a concurrent upload in the meantime.
+                folder_details = await db_manager.find_one(db, FOLDERS, query)
+                parent_id = folder_details.get("doc_id")
         else:
             # Use existing folder
             parent_id = folder_details.get("doc_id")
     
-    # Insert file record (always, regardless of whether folders exist)
+    if await name_taken(db, FILES, user_id, parent_id, file_name.strip().lower()):
+        return response_helper(400, translate("drive.files.already_exists"))
+
+    # Insert file record (always, regardless of whether folders exist); names are
+    # unique per folder (see app.managers.indexes).
     file_data = {
         "doc_id": file_id,
         "type": payload.get("file_type"),
@@ -80,7 +125,10 @@ async def get_presigned_url(user, payload):
         "created_by": user_id,
         "iv": payload.get("iv"),
     }
-    db_manager.insert_one(db, FILES, file_data)
+    try:
+        await db_manager.insert_one(db, FILES, file_data)
+    except DuplicateKeyError:
+        return response_helper(400, translate("drive.files.already_exists"))
     
     # Generate presigned upload URL
     upload_url = generate_upload_url(final_file_path)
@@ -93,16 +141,17 @@ async def rename_file(user, payload):
     name = payload.get("name").strip()
     file_id = payload.get("file_id")
     lower_name = name.lower()
-    query = {"created_by": user.get("user_id"), "lower_name": lower_name, "doc_id": {"$ne": file_id}}
-    
-    if payload.get("parent_id"):
-        query["parent_id"] = payload.get("parent_id")
-    
-    file = db_manager.find_one(db, FILES, query)
-    if file:
+
+    # Check against the folder the item is actually in, not the one the client claims.
+    item = await db_manager.find_one(db, FILES, {"doc_id": file_id, "created_by": user.get("user_id")}, {"_id": False, "parent_id": True})
+    if not item:
+        return response_helper(404, translate("drive.files.not_found"))
+    if await name_taken(db, FILES, user.get("user_id"), item.get("parent_id"), lower_name, file_id):
+        return response_helper(400, translate("drive.files.already_exists"))
+    try:
+        await db_manager.update_one(db, FILES, {"doc_id": file_id, "created_by": user.get("user_id")}, {"$set": {"name": name, "lower_name": lower_name}})
+    except DuplicateKeyError:
         return response_helper(400, translate("drive.files.already_exists"))
-    
-    db_manager.update_one(db, FILES, {"doc_id": file_id, "created_by": user.get("user_id")}, {"$set": {"name": name, "lower_name": lower_name}})
     return response_helper(200, translate("drive.files.renamed"))
 
 
@@ -110,21 +159,72 @@ async def delete_files(user, payload):
     db = user.get("db")
     file_ids = payload.get("file_ids")
     user_id = user.get("user_id")
-    db_manager.update_many(db, FILES, {"doc_id": {"$in": file_ids}, "created_by": user_id}, {"$set": {"access": False, "delete_by": user_id, "deleted_at": create_timestamp()}})
+    await db_manager.update_many(db, FILES, {"doc_id": {"$in": file_ids}, "created_by": user_id}, {"$set": {"access": False, "delete_by": user_id, "deleted_at": create_timestamp()}})
     return response_helper(200, translate("drive.files.deleted"))
 
 
+async def folder_ancestors(db, user_id, folder_id):
+    """Ids of folder_id and every folder above it, one query per level."""
+    ancestors = set()
+    while folder_id and folder_id not in ancestors:
+        ancestors.add(folder_id)
+        folder = await db_manager.find_one(db, FOLDERS, {"doc_id": folder_id, "created_by": user_id}, {"_id": False, "parent_id": True})
+        folder_id = folder.get("parent_id") if folder else None
+    return ancestors
+
+
+async def move_items(db, collection_name, user_id, item_ids, parent_id):
+    """Move files or folders into parent_id, reporting each item.
+
+    An item is skipped when the destination already holds the same name (including
+    an item moved earlier in this batch) or when a folder would end up inside itself.
+    Items already in the destination are reported as moved. If a clashing item
+    appears between the check and the move, only the items that did move are
+    reported as moved.
+    """
+    items = await db_manager.find(db, collection_name, {"created_by": user_id, "doc_id": {"$in": item_ids}}, {"_id": False, "doc_id": True, "name": True, "lower_name": True, "parent_id": True})
+    taken = set(await db_manager.distinct(db, collection_name, "lower_name", {
+        "created_by": user_id,
+        "parent_id": parent_id,
+        "doc_id": {"$nin": item_ids},
+        "lower_name": {"$in": [item.get("lower_name") for item in items]},
+        "access": db_manager.live_filter(collection_name),
+    }))
+    taken.update(item.get("lower_name") for item in items if item.get("parent_id") == parent_id)
+    ancestors = await folder_ancestors(db, user_id, parent_id) if collection_name == FOLDERS else set()
+
+    found = {item.get("doc_id"): item for item in items}
+    results = []
+    moved_ids = []
+    for doc_id in dict.fromkeys(item_ids):
+        item = found.get(doc_id)
+        if not item:
+            results.append({"doc_id": doc_id, "status": "not_found"})
+            continue
+        if item.get("parent_id") == parent_id:
+            results.append({"doc_id": doc_id, "name": item.get("name"), "status": "moved"})
+            continue
+        if doc_id in ancestors or item.get("lower_name") in taken:
+            results.append({"doc_id": doc_id, "name": item.get("name"), "status": "conflict"})
+            continue
+        taken.add(item.get("lower_name"))
+        moved_ids.append(doc_id)
+        results.append({"doc_id": doc_id, "name": item.get("name"), "status": "moved"})
+
+    if moved_ids:
+        try:
+            await db_manager.update_many(db, collection_name, {"doc_id": {"$in": moved_ids}, "created_by": user_id}, {"$set": {"parent_id": parent_id, "updated_at": create_timestamp()}})
+        except DuplicateKeyError:
+            # update_many stops at the clash; whatever came before it has moved.
+            arrived = set(await db_manager.distinct(db, collection_name, "doc_id", {"created_by": user_id, "doc_id": {"$in": moved_ids}, "parent_id": parent_id}))
+            for result in results:
+                if result["doc_id"] in moved_ids and result["doc_id"] not in arrived:
+                    result["status"] = "conflict"
+    return results
+
+
 async def move_files(user, payload):
     db = user.get("db")
-    file_ids = payload.get("file_ids")
-    parent_id = payload.get("parent_id")
-    query = {"created_by": user.get("user_id"), "doc_id": {"$in": file_ids}}
-    files = db_manager.find(db, FILES, query)
-    files_moved = []
-    for item in files:
-        individual_query = {"created_by": user.get("user_id"), "parent_id": parent_id, "lower_name": item.get("lower_name")}
-        if not db_manager.find_one(db, FILES, individual_query):
-            db_manager.update_one(db, FILES, {"doc_id": item.get("doc_id")}, {"$set": {"parent_id": parent_id}})
-            files_moved.append(item.get("name"))
-    
-    return response_helper(200, translate("drive.files.moved"), files_moved=files_moved)
+    results = await move_items(db, FILES, user.get("user_id"), payload.get("file_ids"), payload.get("parent_id"))
+    files_moved = [item["name"] for item in results if item["status"] == "moved"]
+    return response_helper(200, translate("drive.files.moved"), files_moved=files_moved, results=results)
@@ -2,6 +2,7 @@ from fastapi import APIRouter,Depends,Query
 from app.api.v1.web.drive.folders.schema import CreateFolder, RenameFolder, MoveFolder, DeleteFolders
 from app.api.v1.web.auth.schema import UserDetails
 from app.framework.permission_services.service import get_current_user
+from app.core.config import settings
 from app.api.v1.web.drive.folders.services import create_folder,delete_folders,rename_folder, move_folders, get_folders_list
 
 FOLDER_URL ="/folder"
@@ -28,5 +29,5 @@ async def move_folder_api(payload: MoveFolder, user: UserDetails = Depends(get_c
 
 
 @router.get(FOLDER_URL+"/list")
-async def get_all_folders_api(parent_id: str = Query(None, description="Parent folder ID", ge=1), user: UserDetails = Depends(get_current_user)):
-    return await get_folders_list(user, parent_id)
\ No newline at end of file
+async def get_all_folders_api(parent_id: str = Query(None, description="Parent folder ID", ge=1), fields: str = Query(None, description="Comma-separated fields to return"), depth: int = Query(1, description="Levels of sub folders to expand", ge=0, le=settings.DRIVE_TREE_MAX_DEPTH), user: UserDetails = Depends(get_current_user)):
+    return await get_folders_list(user, parent_id, fields, depth)
\ No newline at end of file
@@ -1,23 +1,17 @@
 
+from collections import defaultdict
+
+from pymongo.errors import DuplicateKeyError
 from app.framework.mongo_db import base_manager as db_manager
 from app.managers.collection_names import FILES, FOLDERS
-from app.utils.utils import response_helper, create_uuid, create_timestamp
+from app.utils.utils import response_helper, create_uuid, create_timestamp, build_projection
+from app.utils.constants import DRIVE_FIELDS
 from app.utils.i8ns import translate
-from app.api.v1.web.drive.files.services import get_files_list
+from app.api.v1.web.drive.files.services import get_files_list, move_items, name_taken
 
 async def create_folder(user, payload):
     db = user.get("db")
     folder_id = create_uuid()
-    query={
-        "created_by": user.get("user_id"),
-        "lower_name": payload.get("name").strip().lower(),
-    }
-    if payload.get("parent_id"):
-        query["parent_id"] = payload.get("parent_id")
-        folder = db_manager.find_one(db, FOLDERS, query)
-        if  folder:
-            return response_helper(400, translate("drive.folders.already_exists"))
-
     folder = {
         "doc_id": folder_id,
         "name": payload.get("name"),
@@ -27,7 +21,13 @@ async def create_folder(user, payload):
         "created_at": create_timestamp(),
 
     }
-    db_manager.insert_one(db, FOLDERS, folder)
+    if await name_taken(db, FOLDERS, folder["created_by"], folder["parent_id"], folder["lower_name"]):
+        return response_helper(400, translate("drive.folders.already_exists"))
+    # Names are unique per parent folder (see app.managers.indexes).
+    try:
+        await db_manager.insert_one(db, FOLDERS, folder)
+    except DuplicateKeyError:
+        return response_helper(400, translate("drive.folders.already_exists"))
     return response_helper(200, translate("drive.folders.created"))
 
 
@@ -35,7 +35,7 @@ async def delete_folders(user, payload):
     db = user.get("db")
     folder_ids = payload.get("folder_ids")
     user_id = user.get("user_id")
-    db_manager.update_many(db, FOLDERS, {"doc_id": {"$in":folder_ids}, "created_by": user_id}, {"$set": {"access": False,"delete_by":user_id, "deleted_at": create_timestamp()}})
+    await db_manager.update_many(db, FOLDERS, {"doc_id": {"$in":folder_ids}, "created_by": user_id}, {"$set": {"access": False,"delete_by":user_id, "deleted_at": create_timestamp()}})
     return response_helper(200, translate("drive.folders.deleted"))
 
 
@@ -44,59 +44,77 @@ async def rename_folder(user, payload):
     name = payload.get("name").strip()
     folder_id = payload.get("folder_id")
     lower_name= name.lower()
-    query={"created_by": user.get("user_id"), "lower_name": lower_name}
 
-    if payload.get("parent_id"):
-        query["parent_id"] = payload.get("parent_id")
-    folder = db_manager.find_one(db, FOLDERS, query)
-    
-    if folder:
+    item = await db_manager.find_one(db, FOLDERS, {"doc_id": folder_id, "created_by": user.get("user_id")}, {"_id": False, "parent_id": True})
+    if not item:
+        return response_helper(404, translate("drive.folders.not_found"))
+    if await name_taken(db, FOLDERS, user.get("user_id"), item.get("parent_id"), lower_name, folder_id):
+        return response_helper(400, translate("drive.folders.already_exists"))
+    try:
+        await db_manager.update_one(db, FOLDERS, {"doc_id": folder_id, "created_by": user.get("user_id")}, {"$set": {"name": name, "lower_name": lower_name}})
+    except DuplicateKeyError:
         return response_helper(400, translate("drive.folders.already_exists"))
-    
-    db_manager.update_one(db, FOLDERS, {"doc_id": folder_id, "created_by": user.get("user_id")}, {"$set": {"name": name, "lower_name": lower_name}})
     return response_helper(200, translate("drive.folders.renamed"))
 
 
 async def move_folders(user, payload):
     db = user.get("db")
-    folder_ids = payload.get("folder_ids")
-    parent_id = payload.get("parent_id")
-    query={"created_by": user.get("user_id"), "doc_id": {"$in":folder_ids}}
-    folders = db_manager.find(db, FOLDERS, query)
-    folders_moved=[]
-    for item in folders:
-        individual_query={"created_by": user.get("user_id"), "parent_id": parent_id, "lower_name": item.get("lower_name")}
-        if not db_manager.find_one(db, FOLDERS, individual_query):
-            db_manager.update_one(db, FOLDERS, {"doc_id": item.get("doc_id")}, {"$set": {"parent_id": parent_id}})
-            folders_moved.append(item.get("name"))
-
+    results = await move_items(db, FOLDERS, user.get("user_id"), payload.get("folder_ids"), payload.get("parent_id"))
+    folders_moved = [item["name"] for item in results if item["status"] == "moved"]
+    return response_helper(200, translate("drive.folders.moved"), folders_moved=folders_moved, results=results)
 
-    db_manager.update_many(db, FOLDERS, {"doc_id": {"$in":folder_ids}, "created_by": user.get("user_id")}, {"$set": {"parent_id": parent_id}})
-    return response_helper(200, translate("drive.folders.moved"), folders_moved=folders_moved)
+async def get_folders_list(user, parent_id, fields=None, depth=1):
+    db = user.get("db")
+    user_id = user.get("user_id")
 
-async def get_folders_list(user, parent_id):
-    query = {"created_by": user.get("user_id")}
-    if parent_id:
-        query["parent_id"] = parent_id
-    
-    folders = get_folders(user, parent_id)
+    try:
+        projection = build_projection(fields, DRIVE_FIELDS)
+    except ValueError:
+        return response_helper(400, translate("fields.invalid"))
+    if projection:
+        # Needed to attach children to their parents below.
+        projection["parent_id"] = True
     
-    for folder in folders:
-        folder["files"] = get_files_list(user, folder.get("doc_id"))
-        folder["sub_folders"] = get_folders(user, folder.get("doc_id"))
+    folders = await get_folders(user, parent_id, projection)
+    files = await get_files_list(user, parent_id, projection)
+
+    # Expand the tree one level at a time: two $in queries per level, no matter
+    # how many folders the level holds.
+    level = folders
+    for _ in range(depth):
+        if not level:
+            break
+        parent_ids = [folder.get("doc_id") for folder in level]
+        query = {"created_by": user_id, "parent_id": {"$in": parent_ids}}
+        child_folders = await db_manager.find(db, FOLDERS, dict(query), projection)
+        child_files = await db_manager.find(db, FILES, dict(query), projection)
+
+        folders_by_parent = group_by_parent(child_folders)
+        files_by_parent = group_by_parent(child_files)
+        for folder in level:
+            folder["files"] = files_by_parent.get(folder.get("doc_id"), [])
+            folder["sub_folders"] = folders_by_parent.get(folder.get("doc_id"), [])
+        level = child_folders
     
     data= {
         "folders": folders,
-        "files": get_files_list(user, parent_id)
+        "files": files
     }
     return response_helper(200, translate("drive.folders.list"), data=data)
 
 
 
-def get_folders(user, parent_id=None):
+def group_by_parent(documents):
+    grouped = defaultdict(list)
+    for document in documents:
+        grouped[document.get("parent_id")].append(document)
+    return grouped
+
+
+async def get_folders(user, parent_id=None, projection=None):
     db = user.get("db")
     query = {"created_by": user.get("user_id")}
     if parent_id:
         query["parent_id"] = parent_id
-    folders = db_manager.find(db, FOLDERS, query)
+    folders = await db_manager.find(db, FOLDERS, query, projection)
     return folders
\ No newline at end of file
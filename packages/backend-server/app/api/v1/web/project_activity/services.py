@@ -3,9 +3,9 @@ from app.utils.utils import create_uuid
 from app.managers import project_activity as project_activity_manager
 
 
-def add_recent_activity(user, project_id, data_type, record_id, action):
+async def add_recent_activity(user, project_id, data_type, record_id, action):
     db = user.get("db")
-    project_activity_manager.insert_one(
+    await project_activity_manager.insert_buffered(
         db,
         {
             "doc_id": create_uuid(),
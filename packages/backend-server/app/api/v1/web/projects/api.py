@@ -23,10 +23,14 @@ async def get_project_api(
     workspace_id: str,
     page: int = Query(1, description="Page number", ge=1),
     limit: int = Query(20, description="Items per page", ge=1),
+    cursor: str = Query(None, description="Cursor from the previous page"),
+    fields: str = Query(None, description="Comma-separated fields to return"),
     user: UserDetails = Depends(get_current_user),
 ):
     query = {"workspace_id": workspace_id}
-    return get_projects(user.get("db"), query, page=page, limit=limit)
+    return await get_projects(
+        user.get("db"), query, fields, page=page, limit=limit, cursor=cursor
+    )
 
 
 @router.get(PROJECT_DETAILS)
@@ -36,7 +40,7 @@ async def get_project_details_api(
     doc_id: str,
     user: UserDetails = Depends(get_current_user),
 ):
-    return get_project_details(user.get("db"), doc_id)
+    return await get_project_details(user.get("db"), doc_id)
 
 
 @router.post(PROJECTS)
@@ -47,7 +51,7 @@ async def create_project_api(
     background_tasks: BackgroundTasks,
     user: UserDetails = Depends(get_current_user),
 ):
-    return add_project(request, user, payload.model_dump(), background_tasks)
+    return await add_project(request, user, payload.model_dump(), background_tasks)
 
 
 @router.put(PROJECT_DETAILS)
@@ -59,7 +63,7 @@ async def update_project_api(
     background_tasks: BackgroundTasks,
     user: UserDetails = Depends(get_current_user),
 ):
-    return update_project(request, user, payload.model_dump(), background_tasks)
+    return await update_project(request, user, payload.model_dump(), background_tasks)
 
 
 @router.delete(PROJECT_DETAILS)
@@ -70,7 +74,7 @@ async def delete_project_api(
     background_tasks: BackgroundTasks,
     user: UserDetails = Depends(get_current_user),
 ):
-    return delete_project(request, user, background_tasks)
+    return await delete_project(request, user, background_tasks)
 
 
 @router.get(TAGS)
@@ -80,7 +84,7 @@ async def get_project_tags_api(
     project_id: str,
     user: UserDetails = Depends(get_current_user),
 ):
-    return get_tags(user.get("db"), project_id)
+    return await get_tags(user.get("db"), project_id)
 
 
 @router.get(PROJECT_KEYS)
@@ -89,4 +93,4 @@ async def get_project_keys_api(
     workspace_id: str,
     user: UserDetails = Depends(get_current_user),
 ):
-    return get_project_keys(request, user)
+    return await get_project_keys(request, user)
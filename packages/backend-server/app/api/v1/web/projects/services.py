@@ -1,30 +1,47 @@
 from app.utils.date_utils import create_timestamp
-from app.utils.utils import create_uuid, response_helper, filter_payload
+from app.utils.utils import (
+    create_uuid,
+    response_helper,
+    filter_payload,
+    build_projection,
+)
+from app.utils.constants import PROJECT_FIELDS
 from app.managers import (
     project as project_manager,
     project_keys as project_keys_manager,
-    secrets as secrets_manager,
+    tags as tags_manager,
 )
 
 from app.utils.i8ns import translate
+from app.framework.mongo_db.pagination import InvalidCursor
+from pymongo.errors import DuplicateKeyError
 
 
-def get_project_details(db, doc_id):
+async def get_project_details(db, doc_id):
     return response_helper(
         200,
         translate("project.details"),
-        data=project_manager.find_one(db, {"doc_id": doc_id}, {"_id": False}),
+        data=await project_manager.find_one(db, {"doc_id": doc_id}, {"_id": False}),
     )
 
 
-def get_projects(db, query, sort=None, projection=None, page=1, limit=20):
-    skip = (page - 1) * limit
-    if not sort:
-        sort = ("_id", 1)
-
-    projects = project_manager.find(
-        db, query, projection, sort=sort, skip=skip, limit=limit
-    )
+async def get_projects(db, query, fields=None, page=1, limit=20, cursor=None):
+    try:
+        projection = build_projection(fields, PROJECT_FIELDS)
+    except ValueError:
+        return response_helper(400, translate("fields.invalid"))
+    try:
+        projects, next_cursor = await project_manager.find_page(
+            db,
+            query,
+            projection,
+            direction=1,
+            limit=limit,
+            cursor=cursor,
+            skip=(page - 1) * limit,
+        )
+    except InvalidCursor:
+        return response_helper(400, translate("pagination.invalid_cursor"))
 
     return response_helper(
         200,
@@ -33,43 +50,41 @@ def get_projects(db, query, sort=None, projection=None, page=1, limit=20):
         page=page,
         limit=limit,
         count=len(projects),
+        next_cursor=next_cursor,
     )
 
 
-def add_project(request, user, payload, background_tasks):
+async def add_project(request, user, payload, background_tasks):
     db = user.get("db")
     user_id = user.get("user_id")
 
     workspace_id = request.path_params.get("workspace_id")
-    project = project_manager.find_one(
-        db,
-        {
-            "workspace_id": workspace_id,
-            "lower_name": payload.get("name").strip().lower(),
-            "created_by": user_id,
-        },
-    )
-    if project:
-        return response_helper(400, translate("project.already_exists"))
-
     payload.update(
         {
             "doc_id": create_uuid(),
             "created_by": user_id,
             "lower_name": payload.get("name").strip().lower(),
             "workspace_id": workspace_id,
+            "secret_counts": {},
+            "tag_counts_seeded": True,
         }
     )
     key = payload.get("key")
     payload.pop("key")
-    project_manager.insert_one(db, payload)
+    if await project_manager.name_taken(db, workspace_id, payload["lower_name"]):
+        return response_helper(400, translate("project.already_exists"))
+    # Names are unique per workspace (see app.managers.indexes).
+    try:
+        await project_manager.insert_one(db, payload)
+    except DuplicateKeyError:
+        return response_helper(400, translate("project.already_exists"))
     if key:
-        add_project_key(db, user_id, payload.get("doc_id"), workspace_id, key)
+        await add_project_key(db, user_id, payload.get("doc_id"), workspace_id, key)
 
     return response_helper(201, translate("project.added"), data=payload)
 
 
-def update_project(request, user, payload, background_tasks):
+async def update_project(request, user, payload, background_tasks):
     db = user.get("db")
     user_id = user.get("user_id")
     workspace_id = request.path_params.get("workspace_id")
@@ -79,27 +94,22 @@ def update_project(request, user, payload, background_tasks):
 
     # Process name if it exists in the payload
     if payload.get("name"):
-        lower_name = payload["name"].strip().lower()
-        payload["lower_name"] = lower_name
-
-        existing_project = project_manager.find_one(
-            db,
-            {
-                "workspace_id": workspace_id,
-                "lower_name": lower_name,
-                "doc_id": {"$ne": doc_id},
-            },
-        )
-        if existing_project:
+        payload["lower_name"] = payload["name"].strip().lower()
+        if await project_manager.name_taken(
+            db, workspace_id, payload["lower_name"], doc_id
+        ):
             return response_helper(400, translate("project.already_exists"))
 
-    # Update project
-    project_details = project_manager.find_one_and_update(
-        db, {"doc_id": doc_id}, {"$set": payload}
-    )
+    # Update project; a name clash surfaces as a DuplicateKeyError.
+    try:
+        project_details = await project_manager.find_one_and_update(
+            db, {"doc_id": doc_id}, {"$set": payload}
+        )
+    except DuplicateKeyError:
+        return response_helper(400, translate("project.already_exists"))
 
     if payload.get("is_default"):
-        project_manager.update_many(
+        await project_manager.update_many(
             db,
             {"workspace_id": workspace_id, "doc_id": {"$ne": doc_id}},
             {"$set": {"is_default": False}},
@@ -108,32 +118,26 @@ def update_project(request, user, payload, background_tasks):
     return response_helper(200, translate("project.updated"), data=project_details)
 
 
-def delete_project(request, user, background_tasks):
+async def delete_project(request, user, background_tasks):
     db = user.get("db")
     doc_id = request.path_params.get("doc_id")
-    if not project_manager.find_one(db, {"doc_id": doc_id}):
+    if not await project_manager.find_one(db, {"doc_id": doc_id}):
         return response_helper(404, translate("project.not_found"))
 
-    project_manager.delete_one(db, {"doc_id": doc_id})
+    await project_manager.delete_one(db, {"doc_id": doc_id})
 
     return response_helper(200, translate("project.deleted"), data={})
 
 
-def get_tags(db, project_id):
-    tags = secrets_manager.distinct(db, "tags", {"project_id": project_id})
-    # Flatten all lists and get unique tags, removing null/None/empty values
-    flat_tags = [
-        tag
-        for sublist in tags
-        for tag in (sublist if isinstance(sublist, list) else [sublist])
-    ]
-    unique_tags = sorted(set(tag for tag in flat_tags if tag not in (None, "", [], {})))
-
-    return response_helper(200, translate("project.tags"), data=unique_tags)
+async def get_tags(db, project_id):
+    counts = await tags_manager.get_project_counts(db, project_id)
+    return response_helper(
+        200, translate("project.tags"), data=list(counts), counts=counts
+    )
 
 
-def add_project_key(db, user_id, project_id, workspace_id, project_key):
-    project_keys_manager.insert_one(
+async def add_project_key(db, user_id, project_id, workspace_id, project_key):
+    await project_keys_manager.insert_one(
         db,
         {
             "doc_id": create_uuid(),
@@ -145,16 +149,19 @@ def add_project_key(db, user_id, project_id, workspace_id, project_key):
     )
 
 
-def get_project_keys(request, user):
+async def get_project_keys(request, user):
     db = user.get("db")
     user_id = user.get("user_id")
-    project_keys = project_keys_manager.find(
+    project_keys = await project_keys_manager.find(
         db,
         {"user_id": user_id, "workspace_id": request.path_params.get("workspace_id")},
     )
+    project_names = await project_manager.get_project_names(
+        db, [key.get("project_id") for key in project_keys]
+    )
     final_project_keys = []
     for key in project_keys:
-        project_name = project_manager.get_project_name(db, key.get("project_id"))
+        project_name = project_names.get(key.get("project_id"))
         if project_name:
             key["project_name"] = project_name
         final_project_keys.append(key)
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Request, Depends
+from fastapi import APIRouter, Request, Depends, Query
 
 from app.api.v1.web.secrets.password_history.schema import AddPasswordHistory
 
 from app.api.v1.web.auth.schema import UserDetails
 from app.framework.permission_services.service import get_current_user
 from app.managers import password_history as password_history_manager
+from app.framework.mongo_db.pagination import InvalidCursor
 from app.api.v1.web.route_constants import PASSWORD_HISTORY
 from app.utils.utils import create_uuid, response_helper, filter_payload
 from app.utils.i8ns import translate
@@ -16,14 +17,26 @@ router = APIRouter()
 @router.get(PASSWORD_HISTORY)
 async def get_password_history_api(
     request: Request,
+    limit: int = Query(20, description="Items per page", ge=1),
+    cursor: str = Query(None, description="Cursor from the previous page"),
     user: UserDetails = Depends(get_current_user),
 ):
     db = user.get("db")
-    password_history = password_history_manager.find(
-        db, {}, sort=[("created_at", -1)], skip=0, limit=20
-    )
+    try:
+        password_history, next_cursor = await password_history_manager.find_page(
+            db,
+            {"created_by": user.get("user_id")},
+            sort_key="created_at",
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidCursor:
+        return response_helper(400, translate("pagination.invalid_cursor"))
     return response_helper(
-        200, translate("password_history.list"), data=password_history
+        200,
+        translate("password_history.list"),
+        data=password_history,
+        next_cursor=next_cursor,
     )
 
 
@@ -42,5 +55,5 @@ async def create_password_history_api(
             "created_at": create_timestamp(),
         }
     )
-    password_history_manager.insert_one(db, payload)
+    await password_history_manager.insert_one(db, payload)
     return response_helper(200, translate("password_history.add"))
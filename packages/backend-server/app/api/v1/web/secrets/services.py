@@ -1,35 +1,96 @@
 from app.utils.date_utils import create_timestamp
-from app.utils.utils import create_uuid, response_helper, filter_payload
-from app.managers import secrets as secrets_manager
+from app.utils.utils import (
+    create_uuid,
+    response_helper,
+    filter_payload,
+    accepts_ndjson,
+    ndjson_response,
+    generate_query_hash,
+    build_projection,
+)
+from app.managers import (
+    secrets as secrets_manager,
+    project as project_manager,
+    tags as tags_manager,
+)
 from app.utils.i8ns import translate
 from app.api.v1.web.project_activity.services import add_recent_activity
-# from app.framework.valkey import services as valkey_services
+from app.framework.mongo_db.pagination import InvalidCursor
+from app.framework.valkey import services as valkey_services
+from pymongo.errors import DuplicateKeyError
+from app.utils.constants import SECRET_TYPE_FIELDS
 
 
 async def get_secrets(request, user, data_type):
     db = user.get("db")
-    page = request.query_params.get("page", None)
-    limit = request.query_params.get("limit", None)
+    cursor = request.query_params.get("cursor")
+    try:
+        page = int(request.query_params.get("page", 1))
+        limit = int(request.query_params.get("limit", 0))
+    except ValueError:
+        return response_helper(400, translate("pagination.invalid_params"))
+    if page < 1 or limit < 0:
+        return response_helper(400, translate("pagination.invalid_params"))
+    fields = request.query_params.get("fields")
+    try:
+        projection = build_projection(fields, SECRET_TYPE_FIELDS[data_type])
+    except ValueError:
+        return response_helper(400, translate("fields.invalid"))
     project_id = request.path_params.get("project_id")
     query = {
         "secret_type": data_type,
         "project_id": project_id,
     }
-    # if valkey_services.check_secret_exists(project_id, data_type, query):
-    #     data = valkey_services.get_secret(project_id, data_type, query)
-    #     return response_helper(
-    #         200, translate(f"{data_type}.list"), data=data, count=len(data)
-    #     )
-
-    if page and limit:
-        skip = (page - 1) * limit
-        secrets = secrets_manager.find(db, query, skip=skip, limit=limit)
-    else:
-        secrets = secrets_manager.find(db, query)
-
-    return response_helper(
-        200, translate(f"{data_type}.list"), data=secrets, count=len(secrets)
+
+    if accepts_ndjson(request):
+        return ndjson_response(
+            secrets_manager.find_iter(db, query, projection, sort=("doc_id", 1))
+        )
+
+    if not limit:
+        # Unbounded listings are not cached; one blob per project would grow
+        # with it and be rewritten after every change.
+        secrets = await secrets_manager.find(db, query, projection)
+        return response_helper(
+            200, translate(f"{data_type}.list"), data=secrets, count=len(secrets)
+        )
+
+    query_hash = generate_query_hash(
+        {
+            "query": query,
+            "page": page,
+            "limit": limit,
+            "cursor": cursor,
+            "projection": projection,
+        }
+    )
+    listing, cache_key = await valkey_services.get_secrets(
+        project_id, data_type, query_hash
     )
+    if listing is not None:
+        return response_helper(200, translate(f"{data_type}.list"), **listing)
+
+    try:
+        secrets, next_cursor = await secrets_manager.find_page(
+            db,
+            query,
+            projection,
+            direction=1,
+            limit=limit,
+            cursor=cursor,
+            skip=(page - 1) * limit,
+        )
+    except InvalidCursor:
+        return response_helper(400, translate("pagination.invalid_cursor"))
+    listing = {
+        "data": secrets,
+        "count": len(secrets),
+        "limit": limit,
+        "next_cursor": next_cursor,
+    }
+
+    await valkey_services.set_secrets(cache_key, listing)
+    return response_helper(200, translate(f"{data_type}.list"), **listing)
 
 
 async def add_secret(request, user, data_type, payload, background_tasks):
@@ -37,19 +98,6 @@ async def add_secret(request, user, data_type, payload, background_tasks):
     user_id = user.get("user_id")
     project_id = request.path_params.get("project_id")
     lower_title = payload.get("title").strip().lower()
-    query = {
-        "lower_title": lower_title,
-        "created_by": user_id,
-        "project_id": project_id,
-        "secret_type": data_type,
-    }
-
-    secrets = secrets_manager.find_one(
-        db,
-        query,
-    )
-    if secrets:
-        return response_helper(400, translate(f"{data_type}.already_exists"))
 
     payload.update(
         {
@@ -60,7 +108,20 @@ async def add_secret(request, user, data_type, payload, background_tasks):
             "secret_type": data_type,
         }
     )
-    secrets_manager.insert_one(db, payload)
+    if await secrets_manager.title_taken(db, project_id, data_type, lower_title):
+        return response_helper(400, translate(f"{data_type}.already_exists"))
+    # Titles are unique per project and type (see app.managers.indexes).
+    try:
+        await secrets_manager.insert_one(db, payload)
+    except DuplicateKeyError:
+        return response_helper(400, translate(f"{data_type}.already_exists"))
+    await project_manager.increment_secret_count(db, project_id, data_type)
+    await tags_manager.adjust_counts(
+        db,
+        project_id,
+        added=tags_manager.tag_set(payload.get("tags")),
+    )
+    await valkey_services.invalidate_secrets(project_id)
     background_tasks.add_task(
         add_recent_activity,
         user,
@@ -69,7 +130,6 @@ async def add_secret(request, user, data_type, payload, background_tasks):
         payload.get("doc_id"),
         "create",
     )
-    # background_tasks.add_task(valkey_services.delete_secret, project_id, data_type)
     return response_helper(201, translate(f"{data_type}.add"), data=payload)
 
 
@@ -83,31 +143,38 @@ async def update_secret(request, user, data_type, payload, background_tasks):
 
     # Process name if it exists in the payload
     if payload.get("title"):
-        lower_title = payload["title"].strip().lower()
-        payload["lower_title"] = lower_title
+        payload["lower_title"] = payload["title"].strip().lower()
+        if await secrets_manager.title_taken(
+            db, project_id, data_type, payload["lower_title"], doc_id
+        ):
+            return response_helper(400, translate(f"{data_type}.already_exists"))
 
-        existing_details = secrets_manager.find_one(
+    # Update details; a title clash surfaces as a DuplicateKeyError. The
+    # previous version comes back in the same round trip for the tag counters.
+    try:
+        previous = await secrets_manager.find_one_and_update(
             db,
-            {
-                "project_id": project_id,
-                "lower_title": lower_title,
-                "doc_id": {"$ne": doc_id},
-                "secret_type": data_type,
-            },
+            {"doc_id": doc_id, "access": {"$ne": False}},
+            {"$set": payload},
+            return_document=False,
         )
-        if existing_details:
-            return response_helper(400, translate(f"{data_type}.already_exists"))
-
-    # Update details
-    secrets_manager.update_one(
-        db,
-        {"doc_id": doc_id},
-        {"$set": payload},
-    )
+    except DuplicateKeyError:
+        return response_helper(400, translate(f"{data_type}.already_exists"))
+    if not previous:
+        return response_helper(404, translate(f"{data_type}.not_found"))
+    if "tags" in payload:
+        old_tags = tags_manager.tag_set(previous.get("tags"))
+        new_tags = tags_manager.tag_set(payload.get("tags"))
+        await tags_manager.adjust_counts(
+            db,
+            previous.get("project_id"),
+            added=new_tags - old_tags,
+            removed=old_tags - new_tags,
+        )
+    await valkey_services.invalidate_secrets(project_id)
     background_tasks.add_task(
         add_recent_activity, user, project_id, data_type, doc_id, "update"
     )
-    # background_tasks.add_task(valkey_services.delete_secret, project_id, data_type)
     return response_helper(200, translate(f"{data_type}.update"), data=payload)
 
 
@@ -116,12 +183,25 @@ async def delete_secret(request, user, data_type, background_tasks):
     doc_id = request.path_params.get("doc_id")
     project_id = request.path_params.get("project_id")
 
-    if not secrets_manager.find_one(db, {"doc_id": doc_id, "secret_type": data_type}):
+    # Flip access in one step so concurrent deletes decrement the counter once.
+    secret = await secrets_manager.find_one_and_update(
+        db,
+        {"doc_id": doc_id, "secret_type": data_type, "access": {"$ne": False}},
+        {"$set": {"access": False, "deleted_at": create_timestamp()}},
+    )
+    if not secret:
         return response_helper(404, translate(f"{data_type}.not_found"))
 
-    secrets_manager.delete_one(db, {"doc_id": doc_id, "secret_type": data_type})
+    await project_manager.increment_secret_count(
+        db, secret.get("project_id"), data_type, -1
+    )
+    await tags_manager.adjust_counts(
+        db,
+        secret.get("project_id"),
+        removed=tags_manager.tag_set(secret.get("tags")),
+    )
+    await valkey_services.invalidate_secrets(project_id)
     background_tasks.add_task(
         add_recent_activity, user, project_id, data_type, doc_id, "delete"
     )
-    # background_tasks.add_task(valkey_services.delete_secret, project_id, data_type)
     return response_helper(200, translate(f"{data_type}.delete"), data={})
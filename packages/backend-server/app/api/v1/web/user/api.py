@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, Request, Query
 from app.api.v1.web.auth.schema import UserDetails
 from app.api.v1.web.user.services import (
     get_favorite_tags,
@@ -18,7 +18,7 @@ router = APIRouter()
 async def get_favorite_tags_api(
     request: Request, user: UserDetails = Depends(get_current_user)
 ):
-    return get_favorite_tags(request, user)
+    return await get_favorite_tags(request, user)
 
 
 @router.post(FAVORITE_TAGS)
@@ -27,7 +27,7 @@ async def update_favorite_tags_api(
     payload: AddFavoriteTags,
     user: UserDetails = Depends(get_current_user),
 ):
-    return update_favorite_tags(request, user, payload.model_dump())
+    return await update_favorite_tags(request, user, payload.model_dump())
 
 
 @router.get(PROFILE)
@@ -39,9 +39,12 @@ async def get_profile_api(
 
 @router.get(LOGIN_HISTORY)
 async def get_login_history_api(
-    request: Request, user: UserDetails = Depends(get_current_user)
+    request: Request,
+    limit: int = Query(10, description="Items per page", ge=1),
+    cursor: str = Query(None, description="Cursor from the previous page"),
+    user: UserDetails = Depends(get_current_user),
 ):
-    return get_login_history(request, user)
+    return await get_login_history(request, user, limit=limit, cursor=cursor)
 
 
 @router.put(PROFILE)
@@ -50,4 +53,4 @@ async def update_profile_api(
     payload: UpdateProfile,
     user: UserDetails = Depends(get_current_user),
 ):
-    return update_profile(request, user, payload.model_dump())
+    return await update_profile(request, user, payload.model_dump())
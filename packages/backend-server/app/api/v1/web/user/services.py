@@ -4,17 +4,19 @@ from app.managers import login_activity as login_activity_manager
 from app.managers import user as user_manager
 from app.utils.i8ns import translate
 from app.utils.utils import filter_payload
+from app.framework.mongo_db.pagination import InvalidCursor
+from app.framework.permission_services.service import invalidate_user
 
 
-def get_favorite_tags(request, user):
-    tags = favorite_tags_manager.find_one(
+async def get_favorite_tags(request, user):
+    tags = await favorite_tags_manager.find_one(
         user.get("db"), {"created_by": user.get("user_id")}
     )
 
     return response_helper(200, translate("user.favorite_tags_list"), data=tags)
 
 
-def update_favorite_tags(request, user, payload):
+async def update_favorite_tags(request, user, payload):
     user_id = user.get("user_id")
     db = user.get("db")
     query = {"created_by": user_id}
@@ -26,7 +28,7 @@ def update_favorite_tags(request, user, payload):
         update_ops["$pull"] = {"tags": {"$in": payload["tag_to_remove"]}}
 
     # Single atomic operation with upsert
-    favorite_tags_manager.update_one(
+    await favorite_tags_manager.update_one(
         db, query, {**update_ops, "$setOnInsert": {"created_by": user_id}}, upsert=True
     )
     return response_helper(200, translate("user.favorite_tags_updated"))
@@ -43,23 +45,32 @@ def get_profile(request, user):
     return response_helper(200, translate("user.profile_details"), data=data)
 
 
-def get_login_history(request, user):
-    login_history = login_activity_manager.find(
-        user.get("db"),
-        {"created_by": user.get("user_id")},
-        sort=[("created_at", -1)],
-        skip=0,
-        limit=10,
+async def get_login_history(request, user, limit=10, cursor=None):
+    try:
+        login_history, next_cursor = await login_activity_manager.find_page(
+            user.get("db"),
+            {"created_by": user.get("user_id")},
+            sort_key="created_at",
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidCursor:
+        return response_helper(400, translate("pagination.invalid_cursor"))
+    return response_helper(
+        200,
+        translate("user.login_history"),
+        data=login_history,
+        next_cursor=next_cursor,
     )
-    return response_helper(200, translate("user.login_history"), data=login_history)
 
 
-def update_profile(request, user, payload):
+async def update_profile(request, user, payload):
     payload = filter_payload(payload)
 
     if payload:
         query = {"user_id": user.get("user_id")}
-        user_manager.update_one(user.get("db"), query, {"$set": payload})
+        await user_manager.update_one(user.get("db"), query, {"$set": payload})
+        invalidate_user(user.get("user_id"))
         return response_helper(200, translate("user.profile_updated"))
     else:
         return response_helper(200, translate("user.no_changes_to_update"))
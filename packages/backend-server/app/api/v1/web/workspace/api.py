@@ -12,11 +12,11 @@ router = APIRouter()
 async def load_initial_data_api(
     request: Request, user: UserDetails = Depends(get_current_user)
 ):
-    return load_initial_data(request, user)
+    return await load_initial_data(request, user)
 
 
 @router.get(TAGS)
 async def get_tags_api(
     request: Request, workspace_id: str, user: UserDetails = Depends(get_current_user)
 ):
-    return get_tags(request, user)
+    return await get_tags(request, user)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -7,18 +9,61 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS512"
     ENV: str
     DB_NAME: str
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_WARMUP_CONNECTIONS: int = 5
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 5000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_STREAM_BATCH_SIZE: int = 500
+    # Record every query shape and write them here on shutdown, for
+    # python -m app.managers.indexes --explain.
+    MONGO_QUERY_SHAPES_DIR: Optional[str] = None
+
+    EVENT_BUFFER_BATCH_SIZE: int = 500
+    EVENT_BUFFER_MAX_LATENCY_MS: int = 200
+    EVENT_BUFFER_QUEUE_SIZE: int = 10000
+    EVENT_BUFFER_BLOCK_WHEN_FULL: bool = True
 
     STACK_AUTH_PROJECT_ID: str
     STACK_AUTH_CLIENT_ID: str
     STACK_AUTH_CLIENT_SECRET: str
+    STACK_AUTH_API_URL: str = "https://api.stack-auth.com"
+    STACK_AUTH_TIMEOUT_SECONDS: float = 5.0
+    STACK_AUTH_CONNECT_TIMEOUT_SECONDS: float = 2.0
+    STACK_AUTH_MAX_CONNECTIONS: int = 20
+    STACK_AUTH_CACHE_SIZE: int = 10000
+    STACK_AUTH_CACHE_TTL_SECONDS: int = 60
     TOTP_SECRET: str
 
+    VALKEY_URL: Optional[str] = None
+    VALKEY_TIMEOUT_SECONDS: float = 0.25
+    VALKEY_RETRY_AFTER_SECONDS: int = 30
+    SECRETS_CACHE_TTL_SECONDS: int = 300
+
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    JWT_CLAIMS_CACHE_SIZE: int = 10000
+
+    USER_AGENT_CACHE_SIZE: int = 4096
+
+    # Request/Mongo timings and the /metrics endpoint. Scrapers must send
+    # "Authorization: Bearer <METRICS_TOKEN>"; without a token /metrics
+    # answers 401 to everyone.
+    METRICS_ENABLED: bool = False
+    METRICS_TOKEN: Optional[str] = None
+
+    DRIVE_TREE_MAX_DEPTH: int = 5
+    DRIVE_DOWNLOAD_URL_WINDOW_SECONDS: int = 900
+    DRIVE_DOWNLOAD_URL_CACHE_SIZE: int = 10000
+
 
     DO_SPACES_KEY:str
     DO_SPACES_SECRET:str
     DO_SPACES_REGION:str
     DO_SPACES_BUCKET:str
     DO_SPACES_ENDPOINT:str
+    # Overrides the regional Spaces endpoint, e.g. a local S3 stub.
+    DO_SPACES_ENDPOINT_URL: Optional[str] = None
     class Config:
         case_sensitive = True
         env_file = ".env"
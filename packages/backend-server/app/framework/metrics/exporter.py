@@ -0,0 +1,141 @@
+"""Prometheus text exposition of this worker's timings, pools, buffers and caches.
+
+Every gunicorn worker keeps its own numbers; scrape each worker (or sum the
+series) rather than expecting one process to see the whole server.
+"""
+
+import hmac
+
+from app.api.v1.web.auth.services import stack_auth_cache
+from app.api.v1.web.drive.files.services import download_url_cache
+from app.core.config import settings
+from app.framework.metrics.registry import (
+    http_request_duration,
+    http_request_mongo_commands,
+    http_request_mongo_duration,
+    mongo_command_documents,
+    mongo_command_duration,
+    mongo_command_failures,
+    render_samples,
+)
+from app.framework.mongo_db.db import pool_monitor
+from app.framework.mongo_db.write_buffer import event_buffer
+from app.framework.permission_services.service import claims_cache, user_cache
+from app.framework.valkey import services as valkey_services
+from app.middlewares.lang_middleware import negotiate_language
+from app.utils.user_agent import parse_user_agent
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+METRICS = (
+    http_request_duration,
+    http_request_mongo_duration,
+    http_request_mongo_commands,
+    mongo_command_duration,
+    mongo_command_documents,
+    mongo_command_failures,
+)
+EVENT_BUFFER_GAUGES = ("queued", "max_queue_size")
+
+
+def authorized(authorization):
+    """Whether an Authorization header carries METRICS_TOKEN; unset, none does."""
+    token = settings.METRICS_TOKEN
+    if not token or not authorization:
+        return False
+    return hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode())
+
+
+def _cache_stats():
+    """{cache name: hits/misses/size/maxsize} for every in-process cache."""
+    caches = {
+        "user": user_cache.stats(),
+        "jwt_claims": claims_cache.stats(),
+        "stack_auth": stack_auth_cache.stats(),
+        "download_url": download_url_cache.stats(),
+    }
+    for name, func in (
+        ("user_agent", parse_user_agent),
+        ("language", negotiate_language),
+    ):
+        info = func.cache_info()
+        caches[name] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+        }
+    return caches
+
+
+def render():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+
+    pool = pool_monitor.snapshot()
+    for key in ("open_connections", "in_use", "waiting"):
+        lines.extend(
+            render_samples(
+                f"mongo_pool_{key}", f"Connection pool {key}.", {(): pool[key]}
+            )
+        )
+    for key in ("checkouts", "checkout_failures", "pool_clears"):
+        lines.extend(
+            render_samples(
+                f"mongo_pool_{key}_total",
+                f"Connection pool {key}.",
+                {(): pool[key]},
+                kind="counter",
+            )
+        )
+    lines.extend(
+        render_samples(
+            "mongo_pool_checkout_wait_ms",
+            "Connection checkout wait over recent checkouts.",
+            {(stat,): value for stat, value in pool["wait_ms"].items()},
+            ("stat",),
+        )
+    )
+
+    for key, value in event_buffer.snapshot().items():
+        gauge = key in EVENT_BUFFER_GAUGES
+        lines.extend(
+            render_samples(
+                f"event_buffer_{key}" if gauge else f"event_buffer_{key}_total",
+                f"Write-behind event buffer {key}.",
+                {(): value},
+                kind="gauge" if gauge else "counter",
+            )
+        )
+
+    caches = _cache_stats()
+    for stat in ("hits", "misses"):
+        lines.extend(
+            render_samples(
+                f"cache_{stat}_total",
+                f"In-process cache {stat}.",
+                {(name,): stats[stat] for name, stats in caches.items()},
+                ("cache",),
+                kind="counter",
+            )
+        )
+    for stat in ("size", "maxsize"):
+        lines.extend(
+            render_samples(
+                f"cache_{stat}",
+                f"In-process cache {stat}.",
+                {(name,): stats[stat] for name, stats in caches.items()},
+                ("cache",),
+            )
+        )
+    for key, value in valkey_services.stats.items():
+        lines.extend(
+            render_samples(
+                f"valkey_secrets_cache_{key}_total",
+                f"Valkey secrets listing cache {key}.",
+                {(): value},
+                kind="counter",
+            )
+        )
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,156 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+
+# Upper bounds in seconds, from a cached lookup to a stalled request.
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class RequestStats:
+    """Mongo work attributed to the request being served."""
+
+    __slots__ = ("mongo_commands", "mongo_seconds")
+
+    def __init__(self):
+        self.mongo_commands = 0
+        self.mongo_seconds = 0.0
+
+
+# Set by TimingMiddleware for the duration of each HTTP request.
+current_request = ContextVar("current_request", default=None)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A per-worker counter rendered in the Prometheus text format."""
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values = {}
+
+    def inc(self, amount=1, *label_values):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        for label_values, value in self._values.items():
+            labels = format_labels(self.labels, label_values)
+            lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """A per-worker histogram rendered in the Prometheus text format.
+
+    Bucket counts are kept per bucket and only made cumulative when rendered,
+    so observe() is a bisect and two increments.
+    """
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}
+
+    def observe(self, value, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            # One slot per bucket plus +Inf, then sum.
+            series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        bounds = [repr(bound) for bound in self.buckets] + ["+Inf"]
+        for label_values, series in self._series.items():
+            names = self.labels + ("le",)
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                labels = format_labels(names, label_values + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def render_samples(name, documentation, samples, labels=(), kind="gauge"):
+    """Render values read from elsewhere (``{label values: value}``) as a metric."""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+    for label_values, value in samples.items():
+        lines.append(
+            f"{name}{format_labels(labels, label_values)} {_format_value(value)}"
+        )
+    return lines
+
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the last response body chunk.",
+    ("method", "route", "status"),
+)
+http_request_mongo_duration = Histogram(
+    "http_request_mongo_duration_seconds",
+    "Time spent in MongoDB commands per request.",
+    ("route",),
+)
+http_request_mongo_commands = Histogram(
+    "http_request_mongo_commands",
+    "MongoDB commands issued per request.",
+    ("route",),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+mongo_command_duration = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command round trip time.",
+    ("command", "collection"),
+)
+mongo_command_documents = Counter(
+    "mongo_command_documents_total",
+    "Documents returned by find/aggregate/getMore or affected by writes.",
+    ("command", "collection"),
+)
+mongo_command_failures = Counter(
+    "mongo_command_failures_total",
+    "MongoDB commands that failed.",
+    ("command", "collection"),
+)
@@ -1,59 +1,105 @@
+from pymongo import DESCENDING
+
+from app.core.config import settings
+from app.framework.mongo_db import pagination
+from app.framework.mongo_db.write_buffer import event_buffer
 from app.utils.date_utils import create_timestamp
 
+# Collections whose documents all store ``access`` explicitly, known once the
+# unique-names migration has run (python -m app.managers.indexes --migrate).
+# Their live filter is access: true, the partial unique indexes' own filter, so
+# queries can use those indexes. Elsewhere documents written before access was
+# stored lack the field, hence $ne: false.
+_explicit_access = frozenset()
+
+
+def enable_unique_names(collection_names):
+    global _explicit_access
+    _explicit_access = frozenset(collection_names)
+
+
+def unique_names_enforced(collection_name):
+    """Whether a unique index, rather than a pre-check, guards names here."""
+    return collection_name in _explicit_access
+
+
+def live_filter(collection_name):
+    return True if collection_name in _explicit_access else {"$ne": False}
 
-def insert_one(db, collection_name, data):
+
+async def insert_one(db, collection_name, data):
     data["created_at"] = create_timestamp()
     data["updated_at"] = create_timestamp()
-    return db[collection_name].insert_one(data)
+    # Unique indexes only cover live documents, i.e. those with access: true.
+    data.setdefault("access", True)
+    return await db[collection_name].insert_one(data)
+
+
+async def insert_many(db, collection_name, data_list, ordered=True):
+    for data in data_list:
+        data.setdefault("access", True)
+    await db[collection_name].insert_many(data_list, ordered=ordered)
 
 
-def insert_many(db, collection_name, data_list):
-    db[collection_name].insert_many(data_list)
+async def insert_buffered(db, collection_name, data):
+    """Queue an append-only document on the write-behind buffer.
+
+    Falls back to a direct insert when the buffer is not running (scripts).
+    """
+    data["created_at"] = create_timestamp()
+    data["updated_at"] = create_timestamp()
+    if not await event_buffer.add(collection_name, data):
+        await db[collection_name].insert_one(data)
 
 
-def update_one(db, collection_name, query, payload, upsert=False, array_filters=None):
-    db[collection_name].update_one(
+async def update_one(
+    db, collection_name, query, payload, upsert=False, array_filters=None
+):
+    await db[collection_name].update_one(
         query, payload, upsert=upsert, array_filters=array_filters
     )
 
 
-def update_many(db, collection_name, query, payload):
-    db[collection_name].update_many(query, payload)
+async def update_many(db, collection_name, query, payload):
+    await db[collection_name].update_many(query, payload)
 
 
-def find_one_and_update(
+async def find_one_and_update(
     db, collection_name, query, update_query, return_document=False
 ):
-    return db[collection_name].find_one_and_update(
+    return await db[collection_name].find_one_and_update(
         query, update_query, return_document=return_document
     )
 
 
-def delete_one(db, collection_name, query, hard_delete=False):
+async def delete_one(db, collection_name, query, hard_delete=False):
     if hard_delete:
-        db[collection_name].delete_one(query)
+        await db[collection_name].delete_one(query)
     else:
-        db[collection_name].update_one(
+        await db[collection_name].update_one(
             query, {"$set": {"access": False, "deleted_at": create_timestamp()}}
         )
 
 
-def delete_many(db, collection_name, query):
-    db[collection_name].update_many(query, {"$set": {"access": False}})
+async def delete_many(db, collection_name, query, hard_delete=False):
+    if hard_delete:
+        await db[collection_name].delete_many(query)
+    else:
+        await db[collection_name].update_many(query, {"$set": {"access": False}})
 
 
-def bulk_write(db, collection_name, data):
-    db[collection_name].bulk_write(data)
+async def bulk_write(db, collection_name, data):
+    await db[collection_name].bulk_write(data)
 
 
-def find_one(db, collection_name, query, projection=None):
-    query["access"] = {"$ne": False}
+async def find_one(db, collection_name, query, projection=None):
+    query["access"] = live_filter(collection_name)
     if projection is None:
         projection = {"_id": False}
-    return db[collection_name].find_one(query, projection)
+    return await db[collection_name].find_one(query, projection)
 
 
-def find(
+async def find(
     db,
     collection_name,
     query,
@@ -63,7 +109,7 @@ def find(
     limit=0,
     collation=None,
 ):
-    query["access"] = {"$ne": False}
+    query["access"] = live_filter(collection_name)
 
     if projection is None:
         projection = {"_id": False}
@@ -80,34 +126,144 @@ def find(
         if isinstance(sort, tuple):
             sort = [sort]
         cursor = cursor.sort(sort)
-    return list(cursor)
+    return await cursor.to_list()
 
 
-def count_documents(db, collection_name, query, collation=None):
+async def find_iter(
+    db, collection_name, query, projection=None, sort=None, batch_size=None
+):
+    """Yield matching documents one at a time, fetching them in batches."""
+    query["access"] = live_filter(collection_name)
+
+    if projection is None:
+        projection = {"_id": False}
+    cursor = db[collection_name].find(
+        query, projection, batch_size=batch_size or settings.MONGO_STREAM_BATCH_SIZE
+    )
+    if sort:
+        if isinstance(sort, tuple):
+            sort = [sort]
+        cursor = cursor.sort(sort)
+    async with cursor:
+        async for document in cursor:
+            yield document
+
+
+def _check_page_bounds(limit, skip=0):
+    # Mongo reads a limit of 0 or less as "no limit".
+    if limit < 1:
+        raise ValueError(f"limit must be at least 1, got {limit}")
+    if skip < 0:
+        raise ValueError(f"skip must not be negative, got {skip}")
+
+
+async def find_page(
+    db,
+    collection_name,
+    query,
+    projection=None,
+    sort_key=pagination.TIEBREAKER,
+    direction=DESCENDING,
+    limit=20,
+    cursor=None,
+    skip=0,
+):
+    """Keyset-paginate a collection, returning the page and the next cursor.
+
+    ``skip`` keeps offset pages working for callers that still send ``page``;
+    it is ignored once a cursor is given.
+    """
+    _check_page_bounds(limit, skip)
+    query["access"] = live_filter(collection_name)
+    if cursor:
+        query = {"$and": [query, pagination.seek_query(cursor, sort_key, direction)]}
+        skip = 0
+
+    if projection is None:
+        projection = {"_id": False}
+    projection = pagination.with_sort_fields(projection, sort_key)
+    documents = (
+        await db[collection_name]
+        .find(query, projection)
+        .sort(pagination.sort_spec(sort_key, direction))
+        .skip(skip)
+        .limit(limit + 1)
+        .to_list()
+    )
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = pagination.encode_cursor(documents[-1], sort_key)
+    return documents, next_cursor
+
+
+async def aggregate_page(
+    db,
+    collection_name,
+    query,
+    stages=None,
+    sort_key=pagination.TIEBREAKER,
+    direction=DESCENDING,
+    limit=20,
+    cursor=None,
+):
+    """Keyset-paginate like find_page, running ``stages`` on the page only.
+
+    The match, sort and limit come first so joins such as $lookup are applied to
+    at most ``limit + 1`` documents however large the collection grows.
+    """
+    _check_page_bounds(limit)
+    query["access"] = live_filter(collection_name)
+    if cursor:
+        query = {"$and": [query, pagination.seek_query(cursor, sort_key, direction)]}
+
+    pipeline = [
+        {"$match": query},
+        {"$sort": dict(pagination.sort_spec(sort_key, direction))},
+        {"$limit": limit + 1},
+        *(stages or []),
+        {"$project": {"_id": False}},
+    ]
+    documents = await aggregate(db, collection_name, pipeline)
+
+    next_cursor = None
+    if len(documents) > limit:
+        documents = documents[:limit]
+        next_cursor = pagination.encode_cursor(documents[-1], sort_key)
+    return documents, next_cursor
+
+
+async def count_documents(db, collection_name, query, collation=None):
     if not collation:
-        return db[collection_name].count_documents(query)
+        return await db[collection_name].count_documents(query)
     else:
-        return db[collection_name].count_documents(query)
+        return await db[collection_name].count_documents(query)
 
 
-def distinct(db, collection_name, field, query):
+async def distinct(db, collection_name, field, query):
     if query is None:
         query = {}
-    return db[collection_name].distinct(field, query)
+    return await db[collection_name].distinct(field, query)
+
+
+async def aggregate(db, collection_name, query):
+    cursor = await db[collection_name].aggregate(query)
+    return await cursor.to_list()
 
 
-def aggregate(db, collection_name, query):
-    data = db[collection_name].aggregate(query)
-    return list(data)
+async def create_index(db, collection_name, field):
+    await db[collection_name].create_index(field)
 
 
-def create_index(db, collection_name, field):
-    db[collection_name].create_index(field)
+async def create_indexes(db, collection_name, index_models):
+    return await db[collection_name].create_indexes(index_models)
 
 
-def drop_index(db, collection_name, name):
-    db[collection_name].drop_index(name)
+async def drop_index(db, collection_name, name):
+    await db[collection_name].drop_index(name)
 
 
-def list_indexes(db, collection_name):
-    db[collection_name].list_indexes()
+async def list_indexes(db, collection_name):
+    cursor = await db[collection_name].list_indexes()
+    return await cursor.to_list()
@@ -0,0 +1,63 @@
+from pymongo import monitoring
+
+from app.framework.metrics.registry import (
+    current_request,
+    mongo_command_documents,
+    mongo_command_duration,
+    mongo_command_failures,
+)
+
+# Commands whose first value is not a collection name.
+_NO_COLLECTION = {"getMore": "collection"}
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """Time every MongoDB command per collection and charge it to the request.
+
+    pymongo publishes these events in the task that issued the command, so
+    current_request is the request being served (None for the event buffer
+    and scripts).
+    """
+
+    def __init__(self):
+        # (connection_id, request_id) -> collection, between started and done.
+        self._pending = {}
+
+    def started(self, event):
+        collection = ""
+        if event.command:
+            field = _NO_COLLECTION.get(event.command_name, event.command_name)
+            value = event.command.get(field)
+            if isinstance(value, str):
+                collection = value
+        self._pending[(event.connection_id, event.request_id)] = collection
+
+    def succeeded(self, event):
+        collection = self._record(event)
+        documents = _count_documents(event.reply)
+        if documents:
+            mongo_command_documents.inc(documents, event.command_name, collection)
+
+    def failed(self, event):
+        collection = self._record(event)
+        mongo_command_failures.inc(1, event.command_name, collection)
+
+    def _record(self, event):
+        collection = self._pending.pop((event.connection_id, event.request_id), "")
+        seconds = event.duration_micros / 1e6
+        mongo_command_duration.observe(seconds, event.command_name, collection)
+        stats = current_request.get()
+        if stats is not None:
+            stats.mongo_commands += 1
+            stats.mongo_seconds += seconds
+        return collection
+
+
+def _count_documents(reply):
+    if not reply:
+        return 0
+    cursor = reply.get("cursor")
+    if cursor:
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+    n = reply.get("n")
+    return n if isinstance(n, int) else 0
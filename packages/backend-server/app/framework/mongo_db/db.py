@@ -1,16 +1,37 @@
-from pymongo import MongoClient
+import asyncio
+
+from pymongo import AsyncMongoClient
 
 from app.core.config import settings
+from app.framework.mongo_db.command_monitor import CommandMonitor
+from app.framework.mongo_db.pool_monitor import PoolMonitor
+from app.framework.mongo_db.query_shapes import QueryShapeRecorder
 
-# Global variable for the MongoDB client
+# Global variables for this worker's MongoDB client and its pool/command telemetry.
+# The client is opened by the app lifespan after gunicorn forks the worker;
+# scripts that run outside the app get one lazily from get_db().
 _client = None
+pool_monitor = PoolMonitor()
+command_monitor = CommandMonitor()
+query_shape_recorder = QueryShapeRecorder()
 
 
 def _get_client():
     """Helper function to initialize the MongoDB client if it hasn't been initialized."""
     global _client
     if _client is None:
-        _client = MongoClient(settings.MONGO_DB_URL, maxIdleTimeMS=300000)
+        listeners = [pool_monitor, command_monitor]
+        if settings.MONGO_QUERY_SHAPES_DIR:
+            listeners.append(query_shape_recorder)
+        _client = AsyncMongoClient(
+            settings.MONGO_DB_URL,
+            maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=300000,
+            waitQueueTimeoutMS=settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            event_listeners=listeners,
+        )
     return _client
 
 
@@ -18,3 +39,26 @@ def get_db(db_name=settings.DB_NAME):
     """Get a specific database."""
     client = _get_client()
     return client[db_name]
+
+
+async def connect():
+    """Open the worker's client and warm up the configured number of connections."""
+    client = _get_client()
+    await client.aconnect()
+    await asyncio.gather(
+        *(
+            client.admin.command("ping")
+            for _ in range(max(settings.MONGO_WARMUP_CONNECTIONS, 1))
+        )
+    )
+
+
+async def close():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+async def ping():
+    await _get_client().admin.command("ping")
@@ -0,0 +1,131 @@
+import logging
+
+from pymongo.errors import PyMongoError
+
+from app.framework.mongo_db import base_manager as db_manager
+
+logger = logging.getLogger(__name__)
+
+# Index options that change how an index behaves; anything else reported by
+# list_indexes (v, ns, background, ...) is server bookkeeping.
+COMPARED_OPTIONS = (
+    "unique",
+    "sparse",
+    "partialFilterExpression",
+    "expireAfterSeconds",
+    "collation",
+)
+
+
+def _spec(document):
+    return {
+        "key": list(dict(document["key"]).items()),
+        **{
+            option: document[option]
+            for option in COMPARED_OPTIONS
+            if option in document
+        },
+    }
+
+
+async def diff_indexes(db, collection_name, index_models):
+    """Compare the declared indexes of a collection with the live ones."""
+    existing = {
+        index["name"]: index
+        for index in await db_manager.list_indexes(db, collection_name)
+        if index["name"] != "_id_"
+    }
+    declared = {model.document["name"]: model for model in index_models}
+
+    missing, changed = [], []
+    for name, model in declared.items():
+        if name not in existing:
+            missing.append(model)
+        elif _spec(existing[name]) != _spec(model.document):
+            changed.append(model)
+    extra = [name for name in existing if name not in declared]
+    return {"missing": missing, "changed": changed, "extra": extra}
+
+
+async def sync_indexes(db, registry, drop_extra=False, dry_run=False):
+    """Create missing indexes, rebuild changed ones and report the drift.
+
+    A collection whose indexes cannot be built (e.g. a unique index over
+    existing duplicates) gets an ``error`` entry; the others are still synced.
+    """
+    report = {}
+    for collection_name, index_models in registry.items():
+        try:
+            diff = await diff_indexes(db, collection_name, index_models)
+            entry = {
+                "missing": [model.document["name"] for model in diff["missing"]],
+                "changed": [model.document["name"] for model in diff["changed"]],
+                "extra": diff["extra"],
+            }
+            report[collection_name] = entry
+            if not dry_run:
+                for model in diff["changed"]:
+                    await db_manager.drop_index(
+                        db, collection_name, model.document["name"]
+                    )
+                if diff["missing"] or diff["changed"]:
+                    await db_manager.create_indexes(
+                        db, collection_name, diff["missing"] + diff["changed"]
+                    )
+                if drop_extra:
+                    for name in diff["extra"]:
+                        await db_manager.drop_index(db, collection_name, name)
+        except PyMongoError as e:
+            logger.error("Failed to sync indexes of %s: %s", collection_name, e)
+            report.setdefault(collection_name, {})["error"] = str(e)
+    return report
+
+
+def has_drift(report):
+    return any(
+        entry.get(key)
+        for entry in report.values()
+        for key in ("missing", "changed", "extra", "error")
+    )
+
+
+def has_errors(report):
+    return any("error" in entry for entry in report.values())
+
+
+def _plan_stages(plan):
+    yield plan.get("stage")
+    for child in ("inputStage", "outerStage", "innerStage"):
+        if child in plan:
+            yield from _plan_stages(plan[child])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+async def explain_query(db, collection_name, query, sort=None):
+    """Return the stages of the winning plan for a find on the collection."""
+    command = {"find": collection_name, "filter": query}
+    if sort:
+        command["sort"] = dict(sort)
+    result = await db.command("explain", command, verbosity="queryPlanner")
+    winning_plan = result["queryPlanner"]["winningPlan"]
+    # SBE plans nest the classic plan one level down.
+    winning_plan = winning_plan.get("queryPlan", winning_plan)
+    return list(_plan_stages(winning_plan))
+
+
+async def find_collection_scans(db, query_shapes):
+    """Explain every recorded query shape and return the ones that scan a collection."""
+    offenders = []
+    for shape in query_shapes:
+        stages = await explain_query(
+            db, shape["collection"], shape["filter"], shape.get("sort")
+        )
+        if "COLLSCAN" in stages:
+            offenders.append({**shape, "stages": stages})
+    return offenders
+
+
+def find_unscoped(query_shapes):
+    """Shapes that select by nothing but liveness, whatever index serves them."""
+    return [shape for shape in query_shapes if not set(shape["filter"]) - {"access"}]
@@ -0,0 +1,57 @@
+import base64
+import json
+
+from pymongo import ASCENDING, DESCENDING
+
+# Unique, time-ordered (uuid7) and present on every document, so it breaks ties
+# between documents sharing the same sort value.
+TIEBREAKER = "doc_id"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(document, sort_key=TIEBREAKER):
+    """Build an opaque cursor pointing just past the given document."""
+    position = {"v": document.get(sort_key), "id": document.get(TIEBREAKER)}
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+        return position["v"], position["id"]
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor(cursor)
+
+
+def sort_spec(sort_key=TIEBREAKER, direction=DESCENDING):
+    if sort_key == TIEBREAKER:
+        return [(TIEBREAKER, direction)]
+    return [(sort_key, direction), (TIEBREAKER, direction)]
+
+
+def seek_query(cursor, sort_key=TIEBREAKER, direction=DESCENDING):
+    """Translate a cursor into a filter matching only the documents after it."""
+    value, doc_id = decode_cursor(cursor)
+    op = "$gt" if direction == ASCENDING else "$lt"
+    if sort_key == TIEBREAKER:
+        return {TIEBREAKER: {op: doc_id}}
+    return {
+        "$or": [
+            {sort_key: {op: value}},
+            {sort_key: value, TIEBREAKER: {op: doc_id}},
+        ]
+    }
+
+
+def with_sort_fields(projection, sort_key=TIEBREAKER):
+    """Make sure an inclusion projection keeps the fields the cursor is built from."""
+    if not projection or not any(
+        value for key, value in projection.items() if key != "_id"
+    ):
+        return projection
+    return {**projection, sort_key: True, TIEBREAKER: True}
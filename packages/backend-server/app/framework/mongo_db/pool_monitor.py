@@ -0,0 +1,75 @@
+from collections import deque
+
+from pymongo import monitoring
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Track connection pool usage of this worker's MongoClient."""
+
+    def __init__(self, sample_size=1000):
+        self.open = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self._recent_waits = deque(maxlen=sample_size)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.open -= 1
+
+    def connection_check_out_started(self, event):
+        self.waiting += 1
+
+    def connection_check_out_failed(self, event):
+        self.waiting -= 1
+        self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        self.waiting -= 1
+        self.in_use += 1
+        self.checkouts += 1
+        wait_ms = event.duration * 1000
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self._recent_waits.append(wait_ms)
+
+    def connection_checked_in(self, event):
+        self.in_use -= 1
+
+    def snapshot(self):
+        recent = sorted(self._recent_waits)
+        return {
+            "open_connections": self.open,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "checkouts": self.checkouts,
+            "checkout_failures": self.checkout_failures,
+            "pool_clears": self.pool_clears,
+            "wait_ms": {
+                "avg": self.total_wait_ms / self.checkouts if self.checkouts else 0.0,
+                "p50": recent[len(recent) // 2] if recent else 0.0,
+                "p99": recent[int(len(recent) * 0.99)] if recent else 0.0,
+                "max": self.max_wait_ms,
+            },
+        }
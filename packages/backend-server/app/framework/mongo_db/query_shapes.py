@@ -0,0 +1,123 @@
+import json
+import os
+from collections.abc import Mapping
+from pathlib import Path
+
+from pymongo import monitoring
+
+# Commands that select documents, and where each keeps its filter and sort.
+_FILTER_FIELDS = {
+    "find": ("filter", "sort"),
+    "findAndModify": ("query", "sort"),
+    "count": ("query", None),
+    "distinct": ("query", None),
+}
+_SYSTEM_DATABASES = {"admin", "config", "local"}
+
+
+def shape_of(value):
+    """A filter with its values replaced by placeholders.
+
+    Booleans and None are kept, since partial indexes such as
+    ``access: true`` only serve queries that repeat them.
+    """
+    if isinstance(value, Mapping):
+        return {key: shape_of(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(item, Mapping) for item in value):
+            # $and / $or clauses each matter to the planner.
+            return [shape_of(item) for item in value]
+        return [shape_of(value[0])] if value else []
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        # Keep range bounds in the numeric type bracket.
+        return 0
+    return "x"
+
+
+def _sort_of(sort):
+    return [[key, direction] for key, direction in sort.items()] if sort else None
+
+
+def _selections(command_name, command):
+    """(filter, sort) of every document selection a command makes."""
+    if command_name in _FILTER_FIELDS:
+        filter_field, sort_field = _FILTER_FIELDS[command_name]
+        sort = command.get(sort_field) if sort_field else None
+        yield command.get(filter_field) or {}, sort
+    elif command_name == "update":
+        for update in command.get("updates", ()):
+            yield update.get("q") or {}, None
+    elif command_name == "delete":
+        for delete in command.get("deletes", ()):
+            yield delete.get("q") or {}, None
+    elif command_name == "aggregate":
+        pipeline = list(command.get("pipeline", ()))
+        query, sort = {}, None
+        if pipeline and "$match" in pipeline[0]:
+            query = pipeline.pop(0)["$match"]
+        if pipeline and "$sort" in pipeline[0]:
+            sort = pipeline[0]["$sort"]
+        yield query, sort
+
+
+class QueryShapeRecorder(monitoring.CommandListener):
+    """Collect the distinct filter/sort shapes the app sends to MongoDB.
+
+    Enabled by MONGO_QUERY_SHAPES_DIR; each worker writes its shapes there on
+    shutdown for ``python -m app.managers.indexes --explain`` to check.
+    """
+
+    def __init__(self):
+        self._shapes = {}
+
+    def started(self, event):
+        if event.database_name in _SYSTEM_DATABASES or not event.command:
+            return
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            return
+        for query, sort in _selections(event.command_name, event.command):
+            shape = {
+                "collection": collection,
+                "filter": shape_of(query),
+                "sort": _sort_of(sort),
+            }
+            key = json.dumps(shape, sort_keys=True)
+            entry = self._shapes.setdefault(key, {**shape, "commands": {}})
+            commands = entry["commands"]
+            commands[event.command_name] = commands.get(event.command_name, 0) + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def shapes(self):
+        return sorted(self._shapes.values(), key=lambda shape: shape["collection"])
+
+    def dump(self, directory):
+        """Write this worker's shapes to ``directory``; returns the file path."""
+        path = Path(directory) / f"query-shapes-{os.getpid()}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.shapes(), indent=2))
+        return path
+
+
+def load_shapes(paths):
+    """Merge shape files, or directories of them, into one list of shapes."""
+    merged = {}
+    for path in map(Path, paths):
+        files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+        for file in files:
+            for shape in json.loads(file.read_text()):
+                key = json.dumps(
+                    {name: shape[name] for name in ("collection", "filter", "sort")},
+                    sort_keys=True,
+                )
+                entry = merged.setdefault(key, {**shape, "commands": {}})
+                for name, count in shape.get("commands", {}).items():
+                    entry["commands"][name] = entry["commands"].get(name, 0) + count
+    return list(merged.values())
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from collections import defaultdict
+
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteBuffer:
+    """Per-worker write-behind buffer for append-only event documents.
+
+    Documents are queued and written with one unordered insert_many per
+    collection once ``max_batch_size`` documents are waiting or the oldest has
+    waited ``max_latency_ms``, whichever comes first.
+    """
+
+    def __init__(
+        self, max_batch_size, max_latency_ms, max_queue_size, block_when_full=True
+    ):
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.block_when_full = block_when_full
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "dropped": 0,
+            "backpressure_waits": 0,
+            "write_errors": 0,
+        }
+        self._db = None
+        self._queue = None
+        self._task = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self, db):
+        self._db = db
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything still queued and stop the writer."""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def add(self, collection_name, document):
+        """Queue a document; returns False if the buffer is not running."""
+        if not self.running:
+            return False
+        item = (collection_name, document)
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            if not self.block_when_full:
+                self.stats["dropped"] += 1
+                return True
+            self.stats["backpressure_waits"] += 1
+            await self._queue.put(item)
+        self.stats["enqueued"] += 1
+        return True
+
+    def snapshot(self):
+        return {
+            **self.stats,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "max_queue_size": self.max_queue_size,
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._write(batch)
+
+    async def _write(self, batch):
+        by_collection = defaultdict(list)
+        for collection_name, document in batch:
+            by_collection[collection_name].append(document)
+
+        for collection_name, documents in by_collection.items():
+            try:
+                await self._db[collection_name].insert_many(documents, ordered=False)
+                self.stats["written"] += len(documents)
+            except BulkWriteError as e:
+                inserted = e.details.get("nInserted", 0)
+                self.stats["written"] += inserted
+                self.stats["dropped"] += len(documents) - inserted
+                self.stats["write_errors"] += 1
+                logger.warning("Partial event write to %s: %s", collection_name, e)
+            except Exception:
+                # Whatever went wrong, keep the writer alive for the next batch.
+                self.stats["dropped"] += len(documents)
+                self.stats["write_errors"] += 1
+                logger.exception(
+                    "Dropped %d events for %s", len(documents), collection_name
+                )
+        self.stats["batches"] += 1
+
+
+event_buffer = WriteBuffer(
+    max_batch_size=settings.EVENT_BUFFER_BATCH_SIZE,
+    max_latency_ms=settings.EVENT_BUFFER_MAX_LATENCY_MS,
+    max_queue_size=settings.EVENT_BUFFER_QUEUE_SIZE,
+    block_when_full=settings.EVENT_BUFFER_BLOCK_WHEN_FULL,
+)
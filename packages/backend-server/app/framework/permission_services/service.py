@@ -1,3 +1,6 @@
+import hashlib
+import time
+
 import jwt
 from fastapi import Header, HTTPException, Response
 from pydantic import ValidationError
@@ -5,25 +8,57 @@ from pydantic import ValidationError
 from app.core.config import settings
 from app.framework.mongo_db.db import get_db
 from app.managers import user as user_manager
+from app.utils.cache import TTLCache
 from app.utils.i8ns import translate
 
 jwt_secret = settings.JWT_SECRET
 jwt_algo = settings.JWT_ALGORITHM
-db = get_db()
+
+# Authenticated user documents by user_id, so the auth dependency does not
+# cost a Mongo round trip on every request.
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+# Verified access-token claims by token digest. Entries live until the token's
+# own exp, so a cache hit can never outlive the token.
+claims_cache = TTLCache(maxsize=settings.JWT_CLAIMS_CACHE_SIZE)
+
+
+def invalidate_user(user_id):
+    """Drop a user from this worker's cache after their document changes."""
+    user_cache.pop(user_id)
+
+
+def _token_digest(token):
+    return hashlib.sha256(token.encode()).digest()
 
 
-def get_current_user(response: Response, access_token: str = Header(...)):
+def invalidate_token(token):
+    """Forget the verified claims of a token, e.g. on logout."""
+    if token:
+        claims_cache.pop(_token_digest(token))
+
+
+def decode_access_token(token):
+    digest = _token_digest(token)
+    claims = claims_cache.get(digest)
+    if claims is None:
+        claims = jwt.decode(token, jwt_secret, algorithms=[str(jwt_algo)])
+        ttl = claims.get("exp", 0) - time.time()
+        if ttl > 0:
+            claims_cache.set(digest, claims, ttl=ttl)
+    return claims
+
+
+async def get_current_user(response: Response, access_token: str = Header(...)):
     token = access_token
     common_message = translate("auth.something_went_wrong")
     if not token:
         raise HTTPException(status_code=401, detail=translate("auth.invalid_header"))
     user_id = None
     try:
-        user_id = jwt.decode(
-            token,
-            jwt_secret,
-            algorithms=[str(jwt_algo)],
-        ).get("user")
+        user_id = decode_access_token(token).get("user")
     except ValidationError:
         response.delete_cookie("refresh_token")
         raise HTTPException(status_code=401, detail=common_message)
@@ -34,11 +69,13 @@ def get_current_user(response: Response, access_token: str = Header(...)):
         response.delete_cookie("refresh_token")
         raise HTTPException(status_code=401, detail=common_message)
 
-    user = user_manager.find_one(db, {"user_id": user_id})
-    if not user:
-        response.delete_cookie("refresh_token")
-        raise HTTPException(status_code=401, detail=common_message)
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await user_manager.find_one(get_db(), {"user_id": user_id})
+        if not user:
+            response.delete_cookie("refresh_token")
+            raise HTTPException(status_code=401, detail=common_message)
+        user_cache.set(user_id, user)
 
-    # adding customer db to user object
-    user["db"] = get_db()
-    return user
+    # adding customer db to a copy of the user object, keeping the cached one clean
+    return {**user, "db": get_db()}
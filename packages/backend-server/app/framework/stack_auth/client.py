@@ -0,0 +1,38 @@
+import httpx
+
+from app.core.config import settings
+
+# Global variable for this worker's Stack Auth client; keeps connections alive
+# between logins instead of opening a new TLS session per call.
+_client = None
+
+
+def get_client():
+    """Return the shared Stack Auth client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=settings.STACK_AUTH_API_URL,
+            headers={
+                "x-stack-access-type": "server",
+                "x-stack-project-id": settings.STACK_AUTH_PROJECT_ID,
+                "x-stack-publishable-client-key": settings.STACK_AUTH_CLIENT_ID,
+                "x-stack-secret-server-key": settings.STACK_AUTH_CLIENT_SECRET,
+            },
+            timeout=httpx.Timeout(
+                settings.STACK_AUTH_TIMEOUT_SECONDS,
+                connect=settings.STACK_AUTH_CONNECT_TIMEOUT_SECONDS,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.STACK_AUTH_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.STACK_AUTH_MAX_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def close():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,18 @@
+import valkey.asyncio as valkey
+
+from app.core.config import settings
+
+# Global variable for the Valkey client
+_client = None
+
+
+def get_client():
+    """Return the shared Valkey client, or None when caching is not configured."""
+    global _client
+    if _client is None and settings.VALKEY_URL:
+        _client = valkey.from_url(
+            settings.VALKEY_URL,
+            socket_timeout=settings.VALKEY_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.VALKEY_TIMEOUT_SECONDS,
+        )
+    return _client
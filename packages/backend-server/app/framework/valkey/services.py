@@ -0,0 +1,118 @@
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from valkey.exceptions import ValkeyError
+
+from app.core.config import settings
+from app.framework.valkey.client import get_client
+
+SECRETS_PREFIX = "secrets"
+# Shared by every worker and part of every listing key; bumping it orphans all
+# cached listings at once.
+EPOCH_KEY = f"{SECRETS_PREFIX}:epoch"
+
+stats = {"hits": 0, "misses": 0, "errors": 0, "invalidations": 0, "epoch_bumps": 0}
+
+# While Valkey is unreachable, skip it until this monotonic time instead of
+# paying a connection timeout on every request.
+_retry_at = 0.0
+# Set when this worker could not bump a project's version. Other workers would
+# keep serving listings cached before that write, so the shared epoch is
+# bumped before this worker uses the cache again.
+_epoch_stale = False
+
+
+async def _get_available_client():
+    global _epoch_stale
+    if time.monotonic() < _retry_at:
+        return None
+    client = get_client()
+    if client is None or not _epoch_stale:
+        return client
+    try:
+        await client.incr(EPOCH_KEY)
+    except ValkeyError:
+        _mark_unavailable()
+        return None
+    _epoch_stale = False
+    stats["epoch_bumps"] += 1
+    return client
+
+
+def _mark_unavailable():
+    global _retry_at
+    stats["errors"] += 1
+    _retry_at = time.monotonic() + settings.VALKEY_RETRY_AFTER_SECONDS
+
+
+def _version_key(project_id):
+    return f"{SECRETS_PREFIX}:{project_id}:version"
+
+
+async def get_secrets(project_id, data_type, query_hash):
+    """Look up a cached secrets listing.
+
+    Returns ``(listing, key)``. On a miss ``listing`` is None and ``key`` is
+    where the fresh listing should be stored; it embeds the epoch and project
+    version read before Mongo is queried, so a write racing the read can never
+    be cached under the new version. ``key`` is None when the cache is down.
+    """
+    client = await _get_available_client()
+    if client is None:
+        return None, None
+    try:
+        epoch, version = await client.mget(EPOCH_KEY, _version_key(project_id))
+        key = (
+            f"{SECRETS_PREFIX}:{project_id}:e{int(epoch or 0)}:v{int(version or 0)}"
+            f":{data_type}:{query_hash}"
+        )
+        cached = await client.get(key)
+    except ValkeyError:
+        _mark_unavailable()
+        return None, None
+
+    if cached is None:
+        stats["misses"] += 1
+        return None, key
+    stats["hits"] += 1
+    return json.loads(cached), key
+
+
+async def set_secrets(key, listing):
+    if key is None:
+        return
+    client = await _get_available_client()
+    if client is None:
+        return
+    try:
+        await client.set(
+            key,
+            json.dumps(jsonable_encoder(listing)),
+            ex=settings.SECRETS_CACHE_TTL_SECONDS,
+        )
+    except ValkeyError:
+        _mark_unavailable()
+
+
+async def invalidate_secrets(project_id):
+    """Orphan every cached listing of a project by bumping its version.
+
+    If the bump cannot be made, the shared epoch is bumped as soon as Valkey
+    answers again. Until then, listings cached before this write may still be
+    served by other workers, for at most VALKEY_RETRY_AFTER_SECONDS after
+    Valkey recovers (and never past SECRETS_CACHE_TTL_SECONDS).
+    """
+    global _epoch_stale
+    if get_client() is None:
+        return
+    client = await _get_available_client()
+    if client is None:
+        _epoch_stale = True
+        return
+    try:
+        await client.incr(_version_key(project_id))
+        stats["invalidations"] += 1
+    except ValkeyError:
+        _epoch_stale = True
+        _mark_unavailable()
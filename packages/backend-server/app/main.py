@@ -1,15 +1,52 @@
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
+from starlette.responses import JSONResponse, Response
 from app.api.v1.api import api_router
 from app.middlewares.lang_middleware import LanguageMiddleware
+from app.middlewares.timing_middleware import TimingMiddleware
 from app.utils.i8ns import load_translations, translate
 from app.core.config import settings
 from app.utils.utils import get_origins
+from app.framework.mongo_db import db as mongo_db
+from app.framework.mongo_db.write_buffer import event_buffer
+from app.framework.stack_auth import client as stack_auth_client
+from app.framework.metrics import exporter as metrics_exporter
+from app.managers.indexes import load_unique_names_state
 
 load_translations()
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One client per worker, opened after gunicorn forks it.
+    try:
+        await mongo_db.connect()
+    except Exception:
+        logger.exception("Failed to warm up the MongoDB connection pool")
+    # Indexes are reconciled once per deploy (python -m app.managers.indexes),
+    # not by every worker. Unique indexes replace the duplicate-name queries
+    # only once migrated.
+    try:
+        await load_unique_names_state(mongo_db.get_db())
+    except Exception:
+        logger.exception("Failed to read the unique-names migration state")
+    event_buffer.start(mongo_db.get_db())
+    yield
+    # Flush queued activity/audit/login events before the client goes away.
+    await event_buffer.stop()
+    if settings.MONGO_QUERY_SHAPES_DIR:
+        mongo_db.query_shape_recorder.dump(settings.MONGO_QUERY_SHAPES_DIR)
+    await stack_auth_client.close()
+    await mongo_db.close()
+
+
 # Configure documentation URLs based on environment
 docs_url = "/docs" if settings.ENV != "production" else None
 redoc_url = "/redoc" if settings.ENV != "production" else None
@@ -21,6 +58,7 @@ app = FastAPI(
     docs_url=docs_url,
     redoc_url=redoc_url,
     openapi_url=openapi_url,
+    lifespan=lifespan,
 )
 
 app.include_router(api_router)
@@ -33,6 +71,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 app.add_middleware(LanguageMiddleware)
+if settings.METRICS_ENABLED:
+    # Added last so it wraps every other middleware.
+    app.add_middleware(TimingMiddleware)
 
 # Templates (HTML)
 templates = Jinja2Templates(directory="templates")
@@ -45,3 +86,30 @@ app.mount("/static", static_files)
 @app.get("/health")
 async def health():
     return {"status": translate("health.status")}
+
+
+@app.get("/ready")
+async def ready():
+    try:
+        await mongo_db.ping()
+        status_code = 200
+    except Exception:
+        status_code = 503
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "mongo": {"ready": status_code == 200, **mongo_db.pool_monitor.snapshot()},
+            "event_buffer": event_buffer.snapshot(),
+        },
+    )
+
+
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(authorization: str = Header("")):
+        if not metrics_exporter.authorized(authorization):
+            return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+        return Response(
+            metrics_exporter.render(), media_type=metrics_exporter.CONTENT_TYPE
+        )
@@ -12,7 +12,9 @@ USER_KEYS = "user_keys"
 PROJECT_KEYS = "project_keys"
 PASSWORD_HISTORY = "password_history"
 PROJECT_ACTIVITY = "project_activity"
+TAGS = "tags"
 
 
 FOLDERS = "folders"
-FILES = "files"
\ No newline at end of file
+FILES = "files"
+MIGRATIONS = "migrations"
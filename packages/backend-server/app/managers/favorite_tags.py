@@ -5,48 +5,71 @@ from app.managers.collection_names import FAVORITE_TAGS
 collection_name = FAVORITE_TAGS
 
 
-def insert_one(db, data):
-    db_manager.insert_one(db, collection_name, data)
+async def insert_one(db, data):
+    await db_manager.insert_one(db, collection_name, data)
 
 
-def insert_many(db, data_list):
-    db_manager.insert_many(db, collection_name, data_list)
+async def insert_many(db, data_list):
+    await db_manager.insert_many(db, collection_name, data_list)
 
 
-def update_one(db, query, payload, upsert=False):
-    db_manager.update_one(db, collection_name, query, payload, upsert=upsert)
+async def update_one(db, query, payload, upsert=False):
+    await db_manager.update_one(db, collection_name, query, payload, upsert=upsert)
 
 
-def update_many(db, query, payload):
-    db_manager.update_many(db, collection_name, query, payload)
+async def update_many(db, query, payload):
+    await db_manager.update_many(db, collection_name, query, payload)
 
 
-def find_one_and_update(db, query, update_query, return_document=False):
-    return db_manager.find_one_and_update(
+async def find_one_and_update(db, query, update_query, return_document=False):
+    return await db_manager.find_one_and_update(
         db, collection_name, query, update_query, return_document=return_document
     )
 
 
-def delete_one(db, query):
-    db_manager.delete_one(db, collection_name, query)
+async def delete_one(db, query):
+    await db_manager.delete_one(db, collection_name, query)
 
 
-def delete_many(db, query):
-    db_manager.delete_many(db, collection_name, query)
+async def delete_many(db, query):
+    await db_manager.delete_many(db, collection_name, query)
 
 
-def distinct(db, field, query=None):
-    return db_manager.distinct(db, collection_name, field, query)
+async def distinct(db, field, query=None):
+    return await db_manager.distinct(db, collection_name, field, query)
 
 
-def find_one(db, query, projection=None):
-    return db_manager.find_one(db, collection_name, query, projection)
+async def find_one(db, query, projection=None):
+    return await db_manager.find_one(db, collection_name, query, projection)
 
 
-def find(db, query, projection=None, sort=None, skip=0, limit=0):
-    cursor = db_manager.find(db, collection_name, query, projection, sort, skip, limit)
+async def find(db, query, projection=None, sort=None, skip=0, limit=0):
+    cursor = await db_manager.find(
+        db, collection_name, query, projection, sort, skip, limit
+    )
     return cursor
 
 
-def count_documents(db, query):
-    return db_manager.count_documents(db, collection_name, query)
+def find_iter(db, query, projection=None, sort=None, batch_size=None):
+    return db_manager.find_iter(
+        db, collection_name, query, projection, sort, batch_size
+    )
+
+
+async def find_page(
+    db,
+    query,
+    projection=None,
+    sort_key="doc_id",
+    direction=-1,
+    limit=20,
+    cursor=None,
+    skip=0,
+):
+    return await db_manager.find_page(
+        db, collection_name, query, projection, sort_key, direction, limit, cursor, skip
+    )
+
+
+async def count_documents(db, query):
+    return await db_manager.count_documents(db, collection_name, query)
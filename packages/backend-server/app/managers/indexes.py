@@ -0,0 +1,270 @@
+"""Declared indexes for every collection.
+
+Reconcile the live database with the registry once per deploy, not from the
+app's workers:
+
+    python -m app.managers.indexes            # create missing/changed indexes
+    python -m app.managers.indexes --check    # report drift only, exit 1 on drift
+    python -m app.managers.indexes --migrate  # required once: backfill + unique names
+    python -m app.managers.indexes --explain DIR  # check recorded query shapes
+
+--explain reads the query shapes an app run recorded with
+MONGO_QUERY_SHAPES_DIR (benchmarks/load_test.py does this), explains each one
+and exits 1 if any scans a whole collection or filters on nothing but
+``access``.
+
+--migrate gives documents that predate it ``access: true``, builds every index
+and records the unique-names migration. If any index fails to build (e.g. live
+duplicates to clean up first) it reports the collection and exits 1 without
+recording it. Until the migration is recorded the app keeps checking names with
+a query before each write; restart the app after migrating.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from app.framework.mongo_db import base_manager as db_manager
+from app.framework.mongo_db import index_builder
+from app.framework.mongo_db.db import get_db
+from app.framework.mongo_db.query_shapes import load_shapes
+from app.managers.collection_names import (
+    AUDIT_LOG,
+    FAVORITE_TAGS,
+    FILES,
+    FOLDERS,
+    LOGIN_ACTIVITY,
+    MIGRATIONS,
+    PASSWORD_HISTORY,
+    PROJECT,
+    PROJECT_ACTIVITY,
+    PROJECT_KEYS,
+    SECRET,
+    TAGS,
+    USER,
+    USER_KEYS,
+    WORKSPACE,
+)
+from app.utils.date_utils import create_timestamp
+
+# Names and titles are unique among live documents only. base_manager.insert_one
+# stores access: true and soft deletes flip it to false, which drops the
+# document out of these partial indexes.
+LIVE = {"access": True}
+UNIQUE_LIVE_COLLECTIONS = (PROJECT, SECRET, FOLDERS, FILES)
+UNIQUE_NAMES_MIGRATION = "unique_live_names"
+
+logger = logging.getLogger(__name__)
+
+INDEXES = {
+    USER: [
+        IndexModel([("uid", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING)]),
+    ],
+    USER_KEYS: [
+        IndexModel([("user_id", ASCENDING)]),
+    ],
+    WORKSPACE: [
+        IndexModel([("doc_id", ASCENDING)]),
+        IndexModel([("created_by", ASCENDING)]),
+    ],
+    PROJECT: [
+        IndexModel([("doc_id", ASCENDING)]),
+        IndexModel(
+            [("workspace_id", ASCENDING), ("lower_name", ASCENDING)],
+            unique=True,
+            partialFilterExpression=LIVE,
+        ),
+        IndexModel([("workspace_id", ASCENDING), ("doc_id", ASCENDING)]),
+    ],
+    PROJECT_KEYS: [
+        IndexModel([("user_id", ASCENDING), ("workspace_id", ASCENDING)]),
+    ],
+    SECRET: [
+        IndexModel([("doc_id", ASCENDING)]),
+        IndexModel(
+            [
+                ("project_id", ASCENDING),
+                ("secret_type", ASCENDING),
+                ("lower_title", ASCENDING),
+            ],
+            unique=True,
+            partialFilterExpression=LIVE,
+        ),
+        IndexModel(
+            [
+                ("project_id", ASCENDING),
+                ("secret_type", ASCENDING),
+                ("doc_id", ASCENDING),
+            ]
+        ),
+    ],
+    PROJECT_ACTIVITY: [
+        IndexModel(
+            [
+                ("project_id", ASCENDING),
+                ("created_at", DESCENDING),
+                ("doc_id", DESCENDING),
+            ]
+        ),
+    ],
+    AUDIT_LOG: [
+        IndexModel(
+            [
+                ("workspace_id", ASCENDING),
+                ("created_at", DESCENDING),
+                ("doc_id", DESCENDING),
+            ]
+        ),
+    ],
+    LOGIN_ACTIVITY: [
+        IndexModel(
+            [
+                ("created_by", ASCENDING),
+                ("created_at", DESCENDING),
+                ("doc_id", DESCENDING),
+            ]
+        ),
+    ],
+    PASSWORD_HISTORY: [
+        IndexModel(
+            [
+                ("created_by", ASCENDING),
+                ("created_at", DESCENDING),
+                ("doc_id", DESCENDING),
+            ]
+        ),
+    ],
+    TAGS: [
+        IndexModel([("project_id", ASCENDING), ("tag", ASCENDING)], unique=True),
+        IndexModel([("workspace_id", ASCENDING), ("tag", ASCENDING)]),
+    ],
+    FAVORITE_TAGS: [
+        IndexModel([("created_by", ASCENDING)]),
+    ],
+    MIGRATIONS: [
+        IndexModel([("doc_id", ASCENDING)], unique=True),
+    ],
+    FOLDERS: [
+        IndexModel([("doc_id", ASCENDING)]),
+        # Also serves listings by parent once live queries filter on access: true.
+        IndexModel(
+            [
+                ("created_by", ASCENDING),
+                ("parent_id", ASCENDING),
+                ("lower_name", ASCENDING),
+            ],
+            unique=True,
+            partialFilterExpression=LIVE,
+        ),
+    ],
+    FILES: [
+        IndexModel([("doc_id", ASCENDING)]),
+        # Also serves listings by parent once live queries filter on access: true.
+        IndexModel(
+            [
+                ("created_by", ASCENDING),
+                ("parent_id", ASCENDING),
+                ("lower_name", ASCENDING),
+            ],
+            unique=True,
+            partialFilterExpression=LIVE,
+        ),
+    ],
+}
+
+
+async def ensure_indexes(db, drop_extra=False, dry_run=False):
+    return await index_builder.sync_indexes(
+        db, INDEXES, drop_extra=drop_extra, dry_run=dry_run
+    )
+
+
+async def mark_live_documents(db):
+    """Give documents written before access: true was stored the flag explicitly."""
+    for collection_name in UNIQUE_LIVE_COLLECTIONS:
+        await db_manager.update_many(
+            db, collection_name, {"access": {"$exists": False}}, {"$set": LIVE}
+        )
+
+
+async def migrate_unique_names(db):
+    """Backfill access, build every index and record the migration if all built."""
+    await mark_live_documents(db)
+    report = await ensure_indexes(db)
+    if not index_builder.has_errors(report):
+        await db_manager.update_one(
+            db,
+            MIGRATIONS,
+            {"doc_id": UNIQUE_NAMES_MIGRATION},
+            {"$set": {"applied_at": create_timestamp()}},
+            upsert=True,
+        )
+    return report
+
+
+async def load_unique_names_state(db):
+    """Switch to index-enforced names if the migration ran; returns whether it did."""
+    migration = await db_manager.find_one(
+        db, MIGRATIONS, {"doc_id": UNIQUE_NAMES_MIGRATION}
+    )
+    if migration:
+        db_manager.enable_unique_names(UNIQUE_LIVE_COLLECTIONS)
+        return True
+    logger.error(
+        "Unique-names migration has not run; names are checked with a query "
+        "before each write. Run python -m app.managers.indexes --migrate."
+    )
+    return False
+
+
+async def check_query_shapes(db, query_shapes):
+    """Recorded shapes that scan a collection or are not scoped to anything."""
+    return {
+        "collection_scans": await index_builder.find_collection_scans(db, query_shapes),
+        "unscoped": index_builder.find_unscoped(query_shapes),
+    }
+
+
+async def _main(args):
+    db = get_db()
+    if args.migrate:
+        report = await migrate_unique_names(db)
+        print(json.dumps(report, indent=2))
+        return 1 if index_builder.has_errors(report) else 0
+
+    await load_unique_names_state(db)
+    if args.explain:
+        offenders = await check_query_shapes(db, load_shapes(args.explain))
+        print(json.dumps(offenders, indent=2))
+        return 1 if any(offenders.values()) else 0
+
+    report = await ensure_indexes(db, drop_extra=args.drop_extra, dry_run=args.check)
+    print(json.dumps(report, indent=2))
+    if index_builder.has_errors(report):
+        return 1
+    return 1 if args.check and index_builder.has_drift(report) else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="only report drift")
+    parser.add_argument(
+        "--drop-extra", action="store_true", help="drop indexes not in the registry"
+    )
+    parser.add_argument(
+        "--migrate",
+        action="store_true",
+        help="backfill access: true, build all indexes and record the migration",
+    )
+    parser.add_argument(
+        "--explain",
+        nargs="+",
+        metavar="PATH",
+        help="recorded query shape files or directories to check",
+    )
+    sys.exit(asyncio.run(_main(parser.parse_args())))
@@ -5,59 +5,127 @@ from app.managers.collection_names import PROJECT
 collection_name = PROJECT
 
 
-def insert_one(db, data):
-    db_manager.insert_one(db, collection_name, data)
+async def insert_one(db, data):
+    await db_manager.insert_one(db, collection_name, data)
     data.pop("_id", None)
 
 
-def insert_many(db, data_list):
-    db_manager.insert_many(db, collection_name, data_list)
+async def insert_many(db, data_list):
+    await db_manager.insert_many(db, collection_name, data_list)
 
 
-def update_one(db, query, payload, upsert=False):
-    db_manager.update_one(db, collection_name, query, payload, upsert=upsert)
+async def update_one(db, query, payload, upsert=False):
+    await db_manager.update_one(db, collection_name, query, payload, upsert=upsert)
 
 
-def update_many(db, query, payload):
-    db_manager.update_many(db, collection_name, query, payload)
+async def update_many(db, query, payload):
+    await db_manager.update_many(db, collection_name, query, payload)
 
 
-def find_one_and_update(db, query, update_query, return_document=True):
-    details = db_manager.find_one_and_update(
+async def find_one_and_update(db, query, update_query, return_document=True):
+    details = await db_manager.find_one_and_update(
         db, collection_name, query, update_query, return_document=return_document
     )
-    details.pop("_id", None)
+    if details:
+        details.pop("_id", None)
     return details
 
 
-def delete_one(db, query):
-    db_manager.delete_one(db, collection_name, query)
+async def delete_one(db, query):
+    await db_manager.delete_one(db, collection_name, query)
 
 
-def delete_many(db, query):
-    db_manager.delete_many(db, collection_name, query)
+async def delete_many(db, query):
+    await db_manager.delete_many(db, collection_name, query)
 
 
-def distinct(db, field, query=None):
-    return db_manager.distinct(db, collection_name, field, query)
+async def distinct(db, field, query=None):
+    return await db_manager.distinct(db, collection_name, field, query)
 
 
-def find_one(db, query, projection=None):
-    return db_manager.find_one(db, collection_name, query, projection)
+async def find_one(db, query, projection=None):
+    return await db_manager.find_one(db, collection_name, query, projection)
 
 
-def find(db, query, projection=None, sort=None, skip=0, limit=0):
-    cursor = db_manager.find(db, collection_name, query, projection, sort, skip, limit)
+async def find(db, query, projection=None, sort=None, skip=0, limit=0):
+    cursor = await db_manager.find(
+        db, collection_name, query, projection, sort, skip, limit
+    )
     return cursor
 
 
-def get_project_name(db, project_id):
+def find_iter(db, query, projection=None, sort=None, batch_size=None):
+    return db_manager.find_iter(
+        db, collection_name, query, projection, sort, batch_size
+    )
+
+
+async def find_page(
+    db,
+    query,
+    projection=None,
+    sort_key="doc_id",
+    direction=-1,
+    limit=20,
+    cursor=None,
+    skip=0,
+):
+    return await db_manager.find_page(
+        db, collection_name, query, projection, sort_key, direction, limit, cursor, skip
+    )
+
+
+async def get_project_name(db, project_id):
     query = {"doc_id": project_id}
-    project = db_manager.find_one(db, collection_name, query, {"name": 1})
+    project = await db_manager.find_one(db, collection_name, query, {"name": 1})
     if not project:
         return None
     return project.get("name")
 
 
-def count_documents(db, query):
-    return db_manager.count_documents(db, collection_name, query)
+async def get_project_names(db, project_ids):
+    """Resolve many project ids to names in one query; unknown ids are omitted."""
+    if not project_ids:
+        return {}
+    projects = await db_manager.find(
+        db,
+        collection_name,
+        {"doc_id": {"$in": list(set(project_ids))}},
+        {"_id": False, "doc_id": True, "name": True},
+    )
+    return {project["doc_id"]: project.get("name") for project in projects}
+
+
+async def name_taken(db, workspace_id, lower_name, doc_id=None):
+    """Check for a duplicate name before a write, until the unique index guards it."""
+    if db_manager.unique_names_enforced(collection_name):
+        return False
+    query = {"workspace_id": workspace_id, "lower_name": lower_name}
+    if doc_id:
+        query["doc_id"] = {"$ne": doc_id}
+    return await find_one(db, query) is not None
+
+
+async def increment_secret_count(db, project_id, data_type, amount=1):
+    # Only once the counters exist; until then the overview counts live secrets
+    # and seeds them (see init_secret_counts), so $inc never starts from zero.
+    await db_manager.update_one(
+        db,
+        collection_name,
+        {"doc_id": project_id, "secret_counts": {"$exists": True}},
+        {"$inc": {f"secret_counts.{data_type}": amount}},
+    )
+
+
+async def init_secret_counts(db, project_id, counts):
+    """Store counters computed from the live secrets if none exist yet."""
+    await db_manager.update_one(
+        db,
+        collection_name,
+        {"doc_id": project_id, "secret_counts": {"$exists": False}},
+        {"$set": {"secret_counts": counts}},
+    )
+
+
+async def count_documents(db, query):
+    return await db_manager.count_documents(db, collection_name, query)
@@ -0,0 +1,74 @@
+"""Rebuild the per-project secret counters from the secrets collection.
+
+add_secret/delete_secret keep ``project.secret_counts`` current with $inc, and
+the dashboard overview seeds them from a live count for projects that have none
+yet. Run this to repair drift (e.g. after manual data changes or a failed
+request):
+
+    python -m app.managers.secret_counts                # every project
+    python -m app.managers.secret_counts --project ID   # a single project
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from collections import defaultdict
+
+from pymongo import UpdateOne
+
+from app.framework.mongo_db import base_manager as db_manager
+from app.framework.mongo_db.db import get_db
+from app.managers.collection_names import PROJECT, SECRET
+
+
+async def count_secrets(db, project_id=None):
+    """Return {project_id: {secret_type: count}} for live secrets."""
+    match = {"access": {"$ne": False}}
+    if project_id:
+        match["project_id"] = project_id
+    rows = await db_manager.aggregate(
+        db,
+        SECRET,
+        [
+            {"$match": match},
+            {
+                "$group": {
+                    "_id": {"project_id": "$project_id", "type": "$secret_type"},
+                    "count": {"$sum": 1},
+                }
+            },
+        ],
+    )
+    counts = defaultdict(dict)
+    for row in rows:
+        counts[row["_id"]["project_id"]][row["_id"]["type"]] = row["count"]
+    return counts
+
+
+async def rebuild_secret_counts(db, project_id=None):
+    """Overwrite ``secret_counts`` on every (or one) project; returns the count map."""
+    counts = await count_secrets(db, project_id)
+    query = {"doc_id": project_id} if project_id else {}
+    project_ids = await db_manager.distinct(db, PROJECT, "doc_id", query)
+    operations = [
+        UpdateOne(
+            {"doc_id": doc_id}, {"$set": {"secret_counts": counts.get(doc_id, {})}}
+        )
+        for doc_id in project_ids
+    ]
+    if operations:
+        await db_manager.bulk_write(db, PROJECT, operations)
+    return {doc_id: counts.get(doc_id, {}) for doc_id in project_ids}
+
+
+async def _main(args):
+    report = await rebuild_secret_counts(get_db(), args.project)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--project", help="only rebuild this project's counters")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
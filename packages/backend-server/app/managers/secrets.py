@@ -5,65 +5,103 @@ from app.managers.collection_names import SECRET
 collection_name = SECRET
 
 
-def insert_one(db, data):
-    db_manager.insert_one(db, collection_name, data)
+async def insert_one(db, data):
+    await db_manager.insert_one(db, collection_name, data)
     data.pop("_id", None)
 
 
-def insert_many(db, data_list):
-    db_manager.insert_many(db, collection_name, data_list)
+async def insert_many(db, data_list):
+    await db_manager.insert_many(db, collection_name, data_list)
 
 
-def update_one(db, query, payload, upsert=False):
-    db_manager.update_one(db, collection_name, query, payload, upsert=upsert)
+async def update_one(db, query, payload, upsert=False):
+    await db_manager.update_one(db, collection_name, query, payload, upsert=upsert)
 
 
-def update_many(db, query, payload):
-    db_manager.update_many(db, collection_name, query, payload)
+async def update_many(db, query, payload):
+    await db_manager.update_many(db, collection_name, query, payload)
 
 
-def find_one_and_update(db, query, update_query, return_document=True):
-    details = db_manager.find_one_and_update(
+async def find_one_and_update(db, query, update_query, return_document=True):
+    details = await db_manager.find_one_and_update(
         db, collection_name, query, update_query, return_document=return_document
     )
-    details.pop("_id")
+    if details:
+        details.pop("_id", None)
     return details
 
 
-def delete_one(db, query):
-    db_manager.delete_one(db, collection_name, query)
+async def delete_one(db, query):
+    await db_manager.delete_one(db, collection_name, query)
 
 
-def delete_many(db, query):
-    db_manager.delete_many(db, collection_name, query)
+async def delete_many(db, query):
+    await db_manager.delete_many(db, collection_name, query)
 
 
-def distinct(db, field, query=None):
-    return db_manager.distinct(db, collection_name, field, query)
+async def distinct(db, field, query=None):
+    return await db_manager.distinct(db, collection_name, field, query)
 
 
-def find_one(db, query, projection=None):
-    return db_manager.find_one(db, collection_name, query, projection)
+async def find_one(db, query, projection=None):
+    return await db_manager.find_one(db, collection_name, query, projection)
 
 
-def find(db, query, projection=None, sort=None, skip=0, limit=0):
-    cursor = db_manager.find(db, collection_name, query, projection, sort, skip, limit)
+async def find(db, query, projection=None, sort=None, skip=0, limit=0):
+    cursor = await db_manager.find(
+        db, collection_name, query, projection, sort, skip, limit
+    )
     return cursor
 
 
-def count_documents(db, query):
-    return db_manager.count_documents(db, collection_name, query)
+def find_iter(db, query, projection=None, sort=None, batch_size=None):
+    return db_manager.find_iter(
+        db, collection_name, query, projection, sort, batch_size
+    )
+
+
+async def find_page(
+    db,
+    query,
+    projection=None,
+    sort_key="doc_id",
+    direction=-1,
+    limit=20,
+    cursor=None,
+    skip=0,
+):
+    return await db_manager.find_page(
+        db, collection_name, query, projection, sort_key, direction, limit, cursor, skip
+    )
 
 
-def get_project_secrets_count(db, data_type, project_id):
-    return count_documents(
+async def count_documents(db, query):
+    return await db_manager.count_documents(db, collection_name, query)
+
+
+async def get_project_secrets_count(db, data_type, project_id):
+    return await count_documents(
         db,
         {"project_id": project_id, "secret_type": data_type, "access": {"$ne": False}},
     )
 
 
-def get_title(db, record_id):
-    secret = find_one(db, {"doc_id": record_id})
+async def title_taken(db, project_id, secret_type, lower_title, doc_id=None):
+    """Check for a duplicate title before a write, until the unique index guards it."""
+    if db_manager.unique_names_enforced(collection_name):
+        return False
+    query = {
+        "project_id": project_id,
+        "secret_type": secret_type,
+        "lower_title": lower_title,
+    }
+    if doc_id:
+        query["doc_id"] = {"$ne": doc_id}
+    return await find_one(db, query) is not None
+
+
+async def get_title(db, record_id):
+    secret = await find_one(db, {"doc_id": record_id})
     if not secret:
         return None
     return secret.get("title")
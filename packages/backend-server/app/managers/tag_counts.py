@@ -0,0 +1,123 @@
+"""Rebuild the materialized tag counters from the secrets collection.
+
+Secret add/update/delete keep the ``tags`` collection current with $inc, and
+the tag endpoints count the projects that have no counters yet on first read.
+Run this to repair drift (e.g. after manual data changes or a failed request):
+
+    python -m app.managers.tag_counts                # every project
+    python -m app.managers.tag_counts --project ID   # a single project
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from collections import defaultdict
+
+from pymongo import DeleteMany, UpdateOne
+
+from app.framework.mongo_db import base_manager as db_manager
+from app.framework.mongo_db.db import get_db
+from app.managers.collection_names import PROJECT, SECRET, TAGS
+
+
+async def rebuild_tag_counts(db, project_ids=None):
+    """Recount the tags of every (or the given) project; returns the rebuilt rows.
+
+    Counters are written as upserts and only rows for tags no secret carries
+    any more are deleted, so increments from adjust_counts running meanwhile
+    never hit a missing or duplicate row. The projects are then marked as
+    counted, which lets adjust_counts keep them current.
+    """
+    match = {"access": {"$ne": False}}
+    if project_ids is not None:
+        match["project_id"] = {"$in": list(project_ids)}
+    rows = await db_manager.aggregate(
+        db,
+        SECRET,
+        [
+            {"$match": match},
+            # A secret counts once per tag, matching tags.tag_set().
+            {
+                "$project": {
+                    "project_id": True,
+                    "tags": {
+                        "$cond": [
+                            {"$isArray": "$tags"},
+                            {"$setUnion": ["$tags", []]},
+                            ["$tags"],
+                        ]
+                    },
+                }
+            },
+            {"$unwind": "$tags"},
+            {"$match": {"tags": {"$nin": [None, ""]}}},
+            {
+                "$group": {
+                    "_id": {"project_id": "$project_id", "tag": "$tags"},
+                    "count": {"$sum": 1},
+                }
+            },
+        ],
+    )
+
+    projects = await db_manager.find(
+        db,
+        PROJECT,
+        {"doc_id": {"$in": list(project_ids)}} if project_ids is not None else {},
+        {"_id": False, "doc_id": True, "workspace_id": True},
+    )
+    workspaces = {
+        project["doc_id"]: project.get("workspace_id") for project in projects
+    }
+    tags = [
+        {
+            "project_id": row["_id"]["project_id"],
+            "workspace_id": workspaces.get(row["_id"]["project_id"]),
+            "tag": row["_id"]["tag"],
+            "count": row["count"],
+        }
+        for row in rows
+    ]
+
+    current = defaultdict(list)
+    for tag in tags:
+        current[tag["project_id"]].append(tag["tag"])
+    operations = [
+        UpdateOne(
+            {"project_id": tag["project_id"], "tag": tag["tag"]},
+            {"$set": {"count": tag["count"], "workspace_id": tag["workspace_id"]}},
+            upsert=True,
+        )
+        for tag in tags
+    ]
+    operations.extend(
+        DeleteMany({"project_id": doc_id, "tag": {"$nin": current.get(doc_id, [])}})
+        for doc_id in workspaces
+    )
+    if project_ids is None:
+        # Counters of projects that no longer exist.
+        operations.append(DeleteMany({"project_id": {"$nin": list(workspaces)}}))
+    if operations:
+        await db_manager.bulk_write(db, TAGS, operations)
+    if workspaces:
+        await db_manager.update_many(
+            db,
+            PROJECT,
+            {"doc_id": {"$in": list(workspaces)}},
+            {"$set": {"tag_counts_seeded": True}},
+        )
+    return tags
+
+
+async def _main(args):
+    project_ids = [args.project] if args.project else None
+    tags = await rebuild_tag_counts(get_db(), project_ids)
+    print(json.dumps(tags, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--project", help="only rebuild this project's tags")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
@@ -0,0 +1,153 @@
+from pymongo import DeleteOne, UpdateOne
+
+from app.framework.mongo_db import base_manager as db_manager
+from app.managers import project as project_manager
+from app.managers.collection_names import TAGS
+from app.managers.tag_counts import rebuild_tag_counts
+
+collection_name = TAGS
+
+
+async def insert_one(db, data):
+    await db_manager.insert_one(db, collection_name, data)
+
+
+async def insert_many(db, data_list):
+    await db_manager.insert_many(db, collection_name, data_list)
+
+
+async def update_one(db, query, payload, upsert=False):
+    await db_manager.update_one(db, collection_name, query, payload, upsert=upsert)
+
+
+async def update_many(db, query, payload):
+    await db_manager.update_many(db, collection_name, query, payload)
+
+
+async def find_one_and_update(db, query, update_query, return_document=False):
+    return await db_manager.find_one_and_update(
+        db, collection_name, query, update_query, return_document=return_document
+    )
+
+
+async def delete_one(db, query):
+    await db_manager.delete_one(db, collection_name, query)
+
+
+async def delete_many(db, query):
+    await db_manager.delete_many(db, collection_name, query)
+
+
+async def distinct(db, field, query=None):
+    return await db_manager.distinct(db, collection_name, field, query)
+
+
+async def find_one(db, query, projection=None):
+    return await db_manager.find_one(db, collection_name, query, projection)
+
+
+async def find(db, query, projection=None, sort=None, skip=0, limit=0):
+    cursor = await db_manager.find(
+        db, collection_name, query, projection, sort, skip, limit
+    )
+    return cursor
+
+
+def find_iter(db, query, projection=None, sort=None, batch_size=None):
+    return db_manager.find_iter(
+        db, collection_name, query, projection, sort, batch_size
+    )
+
+
+async def find_page(
+    db,
+    query,
+    projection=None,
+    sort_key="doc_id",
+    direction=-1,
+    limit=20,
+    cursor=None,
+    skip=0,
+):
+    return await db_manager.find_page(
+        db, collection_name, query, projection, sort_key, direction, limit, cursor, skip
+    )
+
+
+async def count_documents(db, query):
+    return await db_manager.count_documents(db, collection_name, query)
+
+
+def tag_set(tags):
+    """The distinct, non-empty tags of a secret; each counts once per secret."""
+    return {tag for tag in tags or [] if tag not in (None, "")}
+
+
+async def adjust_counts(db, project_id, added=(), removed=()):
+    """Apply one secret's tag changes to the per-project counters in one round trip.
+
+    Only once the project's counters exist; until then the tag endpoints count
+    its live secrets on first read, so $inc never starts from zero. New
+    counters take their workspace from the project document, never from the
+    request, so they cannot be filed under another workspace.
+    """
+    if not added and not removed:
+        return
+    project = await project_manager.find_one(
+        db,
+        {"doc_id": project_id, "tag_counts_seeded": True},
+        {"_id": False, "workspace_id": True},
+    )
+    if not project:
+        return
+    workspace_id = project.get("workspace_id")
+    operations = [
+        UpdateOne(
+            {"project_id": project_id, "tag": tag},
+            {"$inc": {"count": 1}, "$setOnInsert": {"workspace_id": workspace_id}},
+            upsert=True,
+        )
+        for tag in added
+    ]
+    for tag in removed:
+        query = {"project_id": project_id, "tag": tag}
+        operations.append(UpdateOne(query, {"$inc": {"count": -1}}))
+        operations.append(DeleteOne({**query, "count": {"$lte": 0}}))
+    if operations:
+        await db_manager.bulk_write(db, collection_name, operations)
+
+
+async def seed_counts(db, project_query):
+    """Count the tags of matching projects that have no counters yet."""
+    unseeded = await project_manager.distinct(
+        db,
+        "doc_id",
+        {**project_query, "access": {"$ne": False}, "tag_counts_seeded": {"$ne": True}},
+    )
+    if unseeded:
+        await rebuild_tag_counts(db, unseeded)
+
+
+async def get_project_counts(db, project_id):
+    await seed_counts(db, {"doc_id": project_id})
+    tags = await find(
+        db,
+        {"project_id": project_id, "count": {"$gt": 0}},
+        {"_id": False, "tag": True, "count": True},
+        sort=("tag", 1),
+    )
+    return {tag["tag"]: tag["count"] for tag in tags}
+
+
+async def get_workspace_counts(db, workspace_id):
+    await seed_counts(db, {"workspace_id": workspace_id})
+    rows = await db_manager.aggregate(
+        db,
+        collection_name,
+        [
+            {"$match": {"workspace_id": workspace_id, "count": {"$gt": 0}}},
+            {"$group": {"_id": "$tag", "count": {"$sum": "$count"}}},
+            {"$sort": {"_id": 1}},
+        ],
+    )
+    return {row["_id"]: row["count"] for row in rows}
@@ -1,11 +1,64 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from app.utils.i8ns import set_language
+from functools import lru_cache
 
+from app.utils.i8ns import available_languages, request_language
 
-class LanguageMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        lang = request.headers.get("Accept-Language", "en").split(",")[0]
-        set_language(lang.lower())
-        response = await call_next(request)
-        return response
+DEFAULT_LANGUAGE = "en"
+
+
+@lru_cache(maxsize=512)
+def negotiate_language(accept_language: str) -> str:
+    """Pick the best supported locale for an Accept-Language header value.
+
+    Tags are tried by descending q-value (ties keep header order); each tag is
+    matched case-insensitively, then by its primary subtag (pt-BR -> pt).
+    Memoized because clients send a small set of distinct header values.
+    """
+    candidates = []
+    for position, part in enumerate(accept_language.split(",")):
+        tag, _, params = part.partition(";")
+        tag = tag.strip().lower().replace("_", "-")
+        if not tag or tag == "*":
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            candidates.append((-quality, position, tag))
+
+    locales = {language.lower(): language for language in available_languages()}
+    for _, _, tag in sorted(candidates):
+        if tag in locales:
+            return locales[tag]
+        primary = tag.split("-")[0]
+        if primary in locales:
+            return locales[primary]
+    return DEFAULT_LANGUAGE
+
+
+class LanguageMiddleware:
+    """Set request_language from Accept-Language without wrapping the response."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        accept_language = DEFAULT_LANGUAGE
+        for name, value in scope["headers"]:
+            if name == b"accept-language":
+                accept_language = value.decode("latin-1")
+                break
+
+        token = request_language.set(negotiate_language(accept_language))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_language.reset(token)
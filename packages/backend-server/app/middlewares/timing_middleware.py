@@ -0,0 +1,92 @@
+import time
+
+from app.framework.metrics.registry import (
+    RequestStats,
+    current_request,
+    http_request_duration,
+    http_request_mongo_commands,
+    http_request_mongo_duration,
+)
+
+# Label for requests no route matched, so stray paths cannot add series.
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_label(scope):
+    """The matched route's full template, e.g. /api/v1/web/{workspace_id}/projects.
+
+    Routes from included routers only know their own part of the path; FastAPI
+    records the router they matched through, with its combined prefix, in the
+    scope. That record is not public API, so if it changes shape the label
+    falls back to the route's own template, which is still bounded.
+    """
+    route = scope.get("route")
+    if route is None:
+        if "endpoint" in scope:
+            # Served by a mounted app such as /static; its root_path is the mount.
+            return f"{scope.get('root_path', '')}/{{path}}"
+        return UNMATCHED_ROUTE
+    included = scope.get("fastapi", {}).get("included_router")
+    context = getattr(included, "include_context", None)
+    prefix = getattr(context, "prefix", "")
+    if not isinstance(prefix, str):
+        prefix = ""
+    return prefix + route.path_format
+
+
+class TimingMiddleware:
+    """Record per-route latency and the Mongo work each request caused.
+
+    The request is timed up to its last body chunk, so background tasks that
+    run after the response are not counted. Responses carry a Server-Timing
+    header with the Mongo time spent before the headers went out.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status = 500
+        recorded = False
+
+        def record():
+            nonlocal recorded
+            recorded = True
+            route = route_label(scope)
+            http_request_duration.observe(
+                time.perf_counter() - started, scope["method"], route, str(status)
+            )
+            http_request_mongo_duration.observe(stats.mongo_seconds, route)
+            http_request_mongo_commands.observe(stats.mongo_commands, route)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                server_timing = (
+                    f'mongo;dur={stats.mongo_seconds * 1000:.1f};desc="'
+                    f'{stats.mongo_commands} commands"'
+                )
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"server-timing", server_timing.encode("latin-1")),
+                ]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get(
+                "more_body", False
+            ):
+                record()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not recorded:
+                record()
+            current_request.reset(token)
@@ -10,3 +10,41 @@ SECRET_TYPE_CARD = "card"
 SECRET_TYPE_SSH_KEY = "ssh_key"
 SECRET_TYPE_NOTE = "note"
 SECRET_TYPE_ENV = "env"
+
+# Fields list endpoints may return through ``fields=``; doc_id is always included.
+SECRET_LIST_FIELDS = ("title", "tags", "data", "notes", "created_at", "updated_at")
+SECRET_TYPE_FIELDS = {
+    SECRET_TYPE_API_KEY: SECRET_LIST_FIELDS + ("env",),
+    SECRET_TYPE_WALLET_PHRASE: SECRET_LIST_FIELDS + ("wallet_type",),
+    SECRET_TYPE_WIFI: SECRET_LIST_FIELDS + ("security_type",),
+    SECRET_TYPE_LICENSE: SECRET_LIST_FIELDS + ("expires_at",),
+    SECRET_TYPE_LOGIN: SECRET_LIST_FIELDS + ("url",),
+    SECRET_TYPE_IDENTITY: SECRET_LIST_FIELDS,
+    SECRET_TYPE_EMAIL: SECRET_LIST_FIELDS,
+    SECRET_TYPE_CARD: SECRET_LIST_FIELDS + ("brand",),
+    SECRET_TYPE_SSH_KEY: SECRET_LIST_FIELDS,
+    SECRET_TYPE_NOTE: SECRET_LIST_FIELDS,
+    SECRET_TYPE_ENV: SECRET_LIST_FIELDS,
+}
+PROJECT_FIELDS = (
+    "name",
+    "description",
+    "is_default",
+    "color",
+    "features",
+    "secret_counts",
+    "workspace_id",
+    "created_at",
+    "updated_at",
+)
+DRIVE_FIELDS = (
+    "name",
+    "parent_id",
+    "type",
+    "size",
+    "path",
+    "key",
+    "iv",
+    "created_at",
+    "updated_at",
+)
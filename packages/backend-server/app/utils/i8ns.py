@@ -2,37 +2,71 @@ import json
 from pathlib import Path
 from contextvars import ContextVar
 
-# Global translation dict
+LOCALES_DIR = Path(__file__).parent.parent / "locales"
+DEFAULT_LANGUAGE = "en"
+
+# Compiled translations: {lang: {"section.key": text}}. Every table already
+# contains the English text for keys its locale lacks, so a lookup is one dict
+# hit. Only English is compiled up front; other locales on first use.
 TRANSLATIONS = {}
 
+# Locale files found on disk, by language code.
+LOCALE_FILES = {}
+
 # Context variable for per-request language
 request_language: ContextVar[str] = ContextVar("request_language", default="en")
 
 
+def _flatten(tree, prefix=""):
+    flat = {}
+    for key, value in tree.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        elif value:
+            flat[path] = value
+    return flat
+
+
+def _compile(lang):
+    with open(LOCALE_FILES[lang], "r", encoding="utf-8") as f:
+        table = _flatten(json.load(f))
+    if lang == DEFAULT_LANGUAGE:
+        return table
+    return {**TRANSLATIONS[DEFAULT_LANGUAGE], **table}
+
+
 def load_translations():
-    locales_dir = Path(__file__).parent.parent / "locales"
-    for file in locales_dir.glob("*.json"):
-        lang = file.stem
-        with open(file, "r", encoding="utf-8") as f:
-            TRANSLATIONS[lang] = json.load(f)
+    """Index the locale files and compile the default language."""
+    LOCALE_FILES.clear()
+    LOCALE_FILES.update({file.stem: file for file in LOCALES_DIR.glob("*.json")})
+    TRANSLATIONS.clear()
+    TRANSLATIONS[DEFAULT_LANGUAGE] = _compile(DEFAULT_LANGUAGE)
+
+
+def get_translations(lang: str) -> dict:
+    table = TRANSLATIONS.get(lang)
+    if table is not None:
+        return table
+    if not LOCALE_FILES:
+        load_translations()
+    if lang not in LOCALE_FILES:
+        return TRANSLATIONS[DEFAULT_LANGUAGE]
+    return TRANSLATIONS.setdefault(lang, _compile(lang))
+
+
+def available_languages():
+    return LOCALE_FILES.keys()
 
 
 def set_language(lang: str):
     # Only set known languages
-    if lang in TRANSLATIONS:
+    if lang in LOCALE_FILES:
         request_language.set(lang)
     else:
         request_language.set("en")
 
 
 def translate(key: str) -> str:
-    lang = request_language.get()
-    current = TRANSLATIONS.get(lang, {})
-
-    for part in key.split("."):
-        if isinstance(current, dict):
-            current = current.get(part)
-        else:
-            return key  # fallback: key itself
-
-    return current or key  # fallback to key if not found
+    # Falls back to English, then to the key itself.
+    return get_translations(request_language.get()).get(key, key)
@@ -7,7 +7,8 @@ session = boto3.session.Session()
 client = session.client(
     "s3",
     region_name=settings.DO_SPACES_REGION,
-    endpoint_url=f"https://{settings.DO_SPACES_REGION}.digitaloceanspaces.com",
+    endpoint_url=settings.DO_SPACES_ENDPOINT_URL
+    or f"https://{settings.DO_SPACES_REGION}.digitaloceanspaces.com",
     aws_access_key_id=settings.DO_SPACES_KEY,
     aws_secret_access_key=settings.DO_SPACES_SECRET,
 )
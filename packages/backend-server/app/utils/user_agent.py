@@ -0,0 +1,39 @@
+from functools import lru_cache
+
+from user_agents import parse
+
+from app.core.config import settings
+
+
+@lru_cache(maxsize=settings.USER_AGENT_CACHE_SIZE)
+def parse_user_agent(user_agent: str):
+    """Parse a User-Agent header, memoized by the raw string.
+
+    Returns an immutable tuple since cached results are shared between callers;
+    login_activity_fields() turns it into the stored document fields.
+    """
+    ua = parse(user_agent)
+    return (
+        ua.browser.family,
+        f"{ua.os.family} {ua.os.version_string}",
+        ua.device.family,
+        ua.is_mobile,
+        ua.is_tablet,
+        ua.is_pc,
+    )
+
+
+def login_activity_fields(user_agent):
+    browser, os, device_type, is_mobile, is_tablet, is_pc = parse_user_agent(
+        user_agent or ""
+    )
+    return {
+        "browser": browser,
+        "os": os,
+        "device": {
+            "type": device_type,
+            "is_mobile": is_mobile,
+            "is_tablet": is_tablet,
+            "is_pc": is_pc,
+        },
+    }
@@ -1,9 +1,12 @@
 from uuid_extensions import uuid7
 from datetime import datetime
 from fastapi.encoders import jsonable_encoder
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, StreamingResponse
+from bson import ObjectId
+import orjson
 import hashlib
 import json
+import math
 from datetime import datetime
 import pytz
 import os
@@ -32,7 +35,93 @@ def response_helper(
         if key not in result:
             result[key] = value
 
-    return JSONResponse(status_code=status_code, content=jsonable_encoder(result))
+    return FastJSONResponse(status_code=status_code, content=result)
+
+
+def _orjson_default(obj):
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    return jsonable_encoder(obj, custom_encoder={ObjectId: str})
+
+
+def dump_json(content) -> bytes:
+    """Serialize content with orjson, as compact UTF-8 JSON.
+
+    Anything orjson does not know goes through jsonable_encoder, and content it
+    rejects outright (e.g. ints over 64 bits) falls back to json.dumps.
+    """
+    try:
+        return orjson.dumps(
+            content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS
+        )
+    except orjson.JSONEncodeError:
+        return json.dumps(
+            jsonable_encoder(content, custom_encoder={ObjectId: str}),
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson straight from the raw content.
+
+    The output parses to the same value as JSONResponse(content=
+    jsonable_encoder(...)) for the types our documents hold (datetimes, UUIDs,
+    ObjectIds, nested dicts and lists), but it is not byte-identical: floats
+    use the shortest form, e.g. 1e16 and 1.5e-7 rather than 1e+16 and 1.5e-07.
+    NaN and Infinity still raise ValueError as they do in JSONResponse; orjson
+    writes them as null, so only bodies containing null are checked for them.
+    """
+
+    def render(self, content) -> bytes:
+        body = dump_json(content)
+        if b"null" in body and _has_non_finite(content):
+            raise ValueError("Out of range float values are not JSON compliant")
+        return body
+
+
+def _has_non_finite(value):
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite(item) for item in value)
+    return False
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def accepts_ndjson(request):
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_response(documents, status_code: int = 200):
+    """Stream an async iterable of documents as newline-delimited JSON."""
+
+    async def lines():
+        async for document in documents:
+            yield dump_json(document) + b"\n"
+
+    return StreamingResponse(
+        lines(), status_code=status_code, media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+def build_projection(fields, allowed):
+    """Turn a comma-separated ``fields`` parameter into an inclusion projection.
+
+    Returns None (whole documents) when no fields are given and raises
+    ValueError for anything outside ``allowed``.
+    """
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    if not requested or not requested.issubset({"doc_id", *allowed}):
+        raise ValueError(fields)
+    return {"_id": False, "doc_id": True, **{field: True for field in requested}}
 
 
 def filter_payload(data):
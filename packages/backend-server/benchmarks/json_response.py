@@ -0,0 +1,68 @@
+"""Compare the old jsonable_encoder + JSONResponse path with response_helper.
+
+Builds a listing of secret documents shaped like the ones get_secrets returns,
+checks that both paths produce identical bytes (secrets hold no floats, the
+one type the two format differently), then times them:
+
+    python -m benchmarks.json_response [--count 5000]
+"""
+
+import argparse
+import timeit
+import uuid
+from datetime import datetime, timedelta
+
+import pytz
+from app.utils.utils import create_uuid, response_helper
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import JSONResponse
+
+ITERATIONS = 20
+
+
+def make_secrets(count):
+    now = pytz.timezone("UTC").localize(datetime(2025, 1, 1, 12, 30, 15, 123456))
+    return [
+        {
+            "doc_id": create_uuid(),
+            "project_id": str(uuid.uuid4()),
+            "secret_type": "login",
+            "title": f"Account {i} – ünïcode",
+            "lower_title": f"account {i} – ünïcode",
+            "tags": ["work", "personal", f"tag-{i % 17}"],
+            "data": "x" * 256,
+            "notes": None,
+            "url": "https://example.com/login",
+            "created_by": str(uuid.uuid4()),
+            "created_at": (now + timedelta(seconds=i)).isoformat(),
+            "updated_at": now + timedelta(seconds=i),
+            "access": True,
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=5000)
+    args = parser.parse_args()
+
+    secrets = make_secrets(args.count)
+    envelope = {"data": secrets, "count": len(secrets), "limit": args.count}
+
+    def old():
+        result = {"status_code": 200, "message": "Accounts loaded", **envelope}
+        return JSONResponse(status_code=200, content=jsonable_encoder(result))
+
+    def new():
+        return response_helper(200, "Accounts loaded", **envelope)
+
+    assert old().body == new().body, "response bodies differ"
+
+    for name, func in (("jsonable_encoder", old), ("response_helper", new)):
+        seconds = timeit.timeit(func, number=ITERATIONS)
+        print(f"{name:>16}: {seconds / ITERATIONS * 1e3:8.2f} ms/response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Compare full HS512 verification with a claims-cache hit in get_current_user.
+
+Run from packages/backend-server with the usual environment (.env) in place:
+
+    python -m benchmarks.jwt_claims_cache
+"""
+
+import timeit
+
+import jwt
+from app.framework.permission_services import service
+from app.utils.jwt_utils import create_jwt_token
+
+ITERATIONS = 100_000
+
+
+def main():
+    token = create_jwt_token({"user": "benchmark-user"})
+
+    def verify():
+        jwt.decode(token, service.jwt_secret, algorithms=[str(service.jwt_algo)])
+
+    def cached():
+        service.decode_access_token(token)
+
+    service.claims_cache.clear()
+    cached()  # warm the cache
+
+    for name, func in (("jwt.decode", verify), ("claims cache", cached)):
+        seconds = timeit.timeit(func, number=ITERATIONS)
+        print(f"{name:>14}: {seconds / ITERATIONS * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Per-request cost of the previous BaseHTTPMiddleware language middleware
+versus the pure-ASGI LanguageMiddleware, plus the memoized header parser.
+
+    python -m benchmarks.language_middleware
+"""
+
+import asyncio
+import time
+import timeit
+
+from app.middlewares.lang_middleware import LanguageMiddleware, negotiate_language
+from app.utils.i8ns import load_translations, set_language, translate
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+REQUESTS = 20_000
+HEADERS = [
+    b"en-US,en;q=0.9",
+    b"pt-BR,pt;q=0.9,en;q=0.8",
+    b"de-DE,de;q=0.9",
+    b"fr-FR,fr;q=0.8,en-US;q=0.5",
+]
+
+
+class BaseHTTPLanguageMiddleware(BaseHTTPMiddleware):
+    """The implementation LanguageMiddleware replaced."""
+
+    async def dispatch(self, request, call_next):
+        lang = request.headers.get("Accept-Language", "en").split(",")[0]
+        set_language(lang.lower())
+        return await call_next(request)
+
+
+async def endpoint(request):
+    return PlainTextResponse(translate("health.status"))
+
+
+def build_app(middleware):
+    app = Starlette(routes=[Route("/", endpoint)])
+    return middleware(app) if middleware else app
+
+
+async def drive(app, count):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    for i in range(count):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/",
+            "raw_path": b"/",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"accept-language", HEADERS[i % len(HEADERS)])],
+            "client": ("127.0.0.1", 1234),
+            "server": ("testserver", 80),
+        }
+        await app(scope, receive, send)
+
+
+def main():
+    load_translations()
+    apps = (
+        ("no middleware", build_app(None)),
+        ("BaseHTTPMiddleware", build_app(BaseHTTPLanguageMiddleware)),
+        ("pure ASGI", build_app(LanguageMiddleware)),
+    )
+    for name, app in apps:
+        asyncio.run(drive(app, 100))  # warm up
+        started = time.perf_counter()
+        asyncio.run(drive(app, REQUESTS))
+        elapsed = time.perf_counter() - started
+        print(f"{name:>18}: {elapsed / REQUESTS * 1e6:8.2f} us/request")
+
+    header = "fr-FR,fr;q=0.8,en-US;q=0.5"
+    parse = negotiate_language.__wrapped__
+    for name, func in (("parse", parse), ("memoized parse", negotiate_language)):
+        seconds = timeit.timeit(lambda func=func: func(header), number=REQUESTS)
+        print(f"{name:>18}: {seconds / REQUESTS * 1e6:8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
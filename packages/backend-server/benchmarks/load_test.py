@@ -0,0 +1,586 @@
+"""End-to-end load test of the core API against a local MongoDB and stubs.
+
+Seeds a throwaway database with synthetic users, workspaces, projects, secrets,
+activity and drive items, boots ``app.main:app`` under uvicorn next to local
+Stack Auth and S3 stubs, and replays sessions of
+
+    login -> 2fa verify -> load-initial-data -> project list
+    -> every secret type list -> dashboard -> drive listing -> file download
+
+at the given concurrency. Latency percentiles and throughput per endpoint are
+printed as JSON (and written to --output) so runs can be compared across
+commits. The server records every query shape it sends; afterwards each is
+explained against the seeded database, and any that scans a collection or is
+not scoped to anything is reported and fails the run:
+
+    docker run -d -p 27017:27017 mongo:7
+    python -m benchmarks.load_test [--users 20] [--sessions 200] [--concurrency 20]
+
+Only MongoDB has to be running; the database is dropped afterwards unless
+--keep-db is given. Set VALKEY_URL to include the listing cache in the run.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import httpx
+import pyotp
+import uvicorn
+
+# Neither module reads settings, so they are safe to import before configure().
+from app.managers.collection_names import (
+    FILES,
+    FOLDERS,
+    PROJECT,
+    PROJECT_ACTIVITY,
+    SECRET,
+    USER,
+    WORKSPACE,
+)
+from app.utils.constants import (
+    SECRET_TYPE_API_KEY,
+    SECRET_TYPE_CARD,
+    SECRET_TYPE_EMAIL,
+    SECRET_TYPE_ENV,
+    SECRET_TYPE_IDENTITY,
+    SECRET_TYPE_LICENSE,
+    SECRET_TYPE_LOGIN,
+    SECRET_TYPE_NOTE,
+    SECRET_TYPE_SSH_KEY,
+    SECRET_TYPE_WALLET_PHRASE,
+    SECRET_TYPE_WIFI,
+)
+from cryptography.fernet import Fernet
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+API = "/api/v1/web"
+
+# Route segment -> secret_type, as wired in app.api.v1.web.secrets.
+SECRET_ROUTES = {
+    "accounts": SECRET_TYPE_LOGIN,
+    "api-keys": SECRET_TYPE_API_KEY,
+    "cards": SECRET_TYPE_CARD,
+    "emails": SECRET_TYPE_EMAIL,
+    "identity": SECRET_TYPE_IDENTITY,
+    "licenses": SECRET_TYPE_LICENSE,
+    "notes": SECRET_TYPE_NOTE,
+    "ssh-keys": SECRET_TYPE_SSH_KEY,
+    "wallet-phrases": SECRET_TYPE_WALLET_PHRASE,
+    "wifi": SECRET_TYPE_WIFI,
+    "env": SECRET_TYPE_ENV,
+}
+SAMPLE_TAGS = ["work", "personal", "finance", "infra", "shared", "archive"]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def users_me(request):
+    # Bench tokens are the Stack Auth user id itself.
+    token = request.headers.get("x-stack-access-token", "")
+    return JSONResponse(
+        {"id": token, "display_name": token, "primary_email": f"{token}@example.com"}
+    )
+
+
+async def s3_object(request):
+    if request.method == "PUT":
+        return Response(headers={"ETag": '"bench"'})
+    return Response(b"\0" * 1024, media_type="application/octet-stream")
+
+
+def start_stubs():
+    """Serve the Stack Auth and S3 stubs from one in-process server."""
+    port = free_port()
+    app = Starlette(
+        routes=[
+            Route("/api/v1/users/me", users_me),
+            Route("/{key:path}", s3_object, methods=["GET", "PUT"]),
+        ]
+    )
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def configure(args, stub_url):
+    """Environment shared by the seeding code in this process and the server.
+
+    Settings are read when app.core.config is first imported, so this has to
+    run before any app module is imported.
+    """
+    env = {
+        "MONGO_DB_URL": args.mongo_url,
+        "DB_NAME": args.db_name,
+        "ENV": "dev",
+        "STACK_AUTH_API_URL": stub_url,
+        "DO_SPACES_ENDPOINT_URL": stub_url,
+        "TOTP_SECRET": Fernet.generate_key().decode(),
+        "MONGO_QUERY_SHAPES_DIR": args.shapes_dir,
+    }
+    defaults = {
+        "JWT_SECRET": "bench-secret",
+        "STACK_AUTH_PROJECT_ID": "bench",
+        "STACK_AUTH_CLIENT_ID": "bench",
+        "STACK_AUTH_CLIENT_SECRET": "bench",
+        "DO_SPACES_KEY": "bench",
+        "DO_SPACES_SECRET": "bench",
+        "DO_SPACES_REGION": "us-east-1",
+        "DO_SPACES_BUCKET": "bench",
+        "DO_SPACES_ENDPOINT": "bench",
+    }
+    os.environ.update(env)
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+
+
+def build_fixtures(args, encrypt_totp_secret, create_uuid, create_timestamp):
+    """Return (documents by collection, bench users) for the seeded dataset."""
+    rng = random.Random(args.seed)
+    now = create_timestamp()
+    docs = defaultdict(list)
+    users = []
+
+    def live(doc):
+        return {**doc, "access": True, "created_at": now, "updated_at": now}
+
+    for n in range(args.users):
+        uid = f"bench-{n}"
+        user_id = create_uuid()
+        workspace_id = create_uuid()
+        totp_secret = pyotp.random_base32()
+        docs[USER].append(
+            live(
+                {
+                    "uid": uid,
+                    "user_id": user_id,
+                    "name": uid,
+                    "email": f"{uid}@example.com",
+                    "language": "en",
+                    "plan": "free",
+                    "workspace_ids": [workspace_id],
+                    "2fa": {
+                        "enabled": True,
+                        "totp_secret": encrypt_totp_secret(totp_secret),
+                    },
+                }
+            )
+        )
+        docs[WORKSPACE].append(
+            live(
+                {
+                    "doc_id": workspace_id,
+                    "created_by": user_id,
+                    "name": "Personal Workspace",
+                    "lower_name": "personal workspace",
+                }
+            )
+        )
+
+        project_ids = []
+        for p in range(args.projects):
+            project_id = create_uuid()
+            project_ids.append(project_id)
+            docs[PROJECT].append(
+                live(
+                    {
+                        "doc_id": project_id,
+                        "name": f"Project {p}",
+                        "lower_name": f"project {p}",
+                        "workspace_id": workspace_id,
+                        "created_by": user_id,
+                        "is_default": p == 0,
+                        "features": {
+                            secret_type: {"enabled": True}
+                            for secret_type in SECRET_ROUTES.values()
+                        },
+                    }
+                )
+            )
+            secret_ids = []
+            for secret_type in SECRET_ROUTES.values():
+                for s in range(args.secrets):
+                    secret_ids.append(create_uuid())
+                    docs[SECRET].append(
+                        live(
+                            {
+                                "doc_id": secret_ids[-1],
+                                "title": f"{secret_type} {s}",
+                                "lower_title": f"{secret_type} {s}",
+                                "project_id": project_id,
+                                "secret_type": secret_type,
+                                "created_by": user_id,
+                                "tags": rng.sample(SAMPLE_TAGS, 2),
+                                # Stands in for the client-side ciphertext.
+                                "data": rng.randbytes(384).hex(),
+                            }
+                        )
+                    )
+            for _ in range(args.activity):
+                docs[PROJECT_ACTIVITY].append(
+                    live(
+                        {
+                            "doc_id": create_uuid(),
+                            "project_id": project_id,
+                            "user_id": user_id,
+                            "record_id": rng.choice(secret_ids),
+                            "data_type": rng.choice(list(SECRET_ROUTES.values())),
+                            "action": rng.choice(["create", "update", "delete"]),
+                        }
+                    )
+                )
+
+        file_ids = []
+        parents = [None]
+        for f in range(args.folders):
+            folder_id = create_uuid()
+            docs[FOLDERS].append(
+                live(
+                    {
+                        "doc_id": folder_id,
+                        "name": f"Folder {f}",
+                        "lower_name": f"folder {f}",
+                        "parent_id": rng.choice(parents),
+                        "created_by": user_id,
+                    }
+                )
+            )
+            parents.append(folder_id)
+        for f in range(args.files):
+            file_ids.append(create_uuid())
+            docs[FILES].append(
+                live(
+                    {
+                        "doc_id": file_ids[-1],
+                        "name": f"file-{f}.txt",
+                        "lower_name": f"file-{f}.txt",
+                        "type": "text/plain",
+                        "size": 1024,
+                        "key": f"{user_id}/files/{file_ids[-1]}.txt",
+                        "parent_id": rng.choice(parents),
+                        "created_by": user_id,
+                    }
+                )
+            )
+
+        users.append(
+            {
+                "uid": uid,
+                "user_id": user_id,
+                "totp_secret": totp_secret,
+                "workspace_id": workspace_id,
+                "project_ids": project_ids,
+                "file_ids": file_ids,
+            }
+        )
+    return docs, users
+
+
+async def seed(args):
+    from app.api.v1.web.auth.services import encrypt_totp_secret
+    from app.framework.mongo_db import base_manager as db_manager
+    from app.framework.mongo_db import db as mongo_db
+    from app.framework.mongo_db import index_builder
+    from app.managers.indexes import migrate_unique_names
+    from app.managers.secret_counts import rebuild_secret_counts
+    from app.managers.tag_counts import rebuild_tag_counts
+    from app.utils.date_utils import create_timestamp
+    from app.utils.utils import create_uuid
+
+    db = mongo_db.get_db()
+    docs, users = build_fixtures(
+        args, encrypt_totp_secret, create_uuid, create_timestamp
+    )
+    for collection_name, documents in docs.items():
+        await db_manager.insert_many(db, collection_name, documents, ordered=False)
+    # Build the indexes and record the migration, as a deploy would.
+    report = await migrate_unique_names(db)
+    if index_builder.has_errors(report):
+        raise RuntimeError(f"index build failed: {report}")
+    # Derive the denormalized counters the same way the repair jobs do.
+    await rebuild_secret_counts(db)
+    await rebuild_tag_counts(db)
+    await mongo_db.close()
+    return users, {name: len(documents) for name, documents in docs.items()}
+
+
+async def check_query_shapes(args):
+    from app.framework.mongo_db import db as mongo_db
+    from app.framework.mongo_db.query_shapes import load_shapes
+    from app.managers import indexes
+
+    shapes = load_shapes([args.shapes_dir])
+    offenders = await indexes.check_query_shapes(mongo_db.get_db(), shapes)
+    await mongo_db.close()
+    shutil.rmtree(args.shapes_dir, ignore_errors=True)
+    return {"recorded": len(shapes), **offenders}
+
+
+async def drop_database(args):
+    from app.framework.mongo_db import db as mongo_db
+
+    await mongo_db.get_db().client.drop_database(args.db_name)
+    await mongo_db.close()
+
+
+def start_server(args):
+    port = free_port()
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(args.workers),
+            "--log-level",
+            "warning",
+            "--no-access-log",
+        ],
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"server exited with {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/ready").status_code == 200:
+                return process, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("server did not become ready within 30s")
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.enabled = True
+
+    async def call(self, name, request, expected=(200,)):
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            response = None
+        elapsed = time.perf_counter() - started
+        if self.enabled:
+            self.latencies[name].append(elapsed)
+            if response is None or response.status_code not in expected:
+                self.errors[name] += 1
+        return response
+
+
+async def session(client, recorder, user):
+    """One user's walk through the core screens."""
+    await recorder.call(
+        "auth.login", client.post(f"{API}/login", json={"uid": user["uid"]})
+    )
+    response = await recorder.call(
+        "auth.2fa_verify",
+        client.post(
+            f"{API}/2fa/verify",
+            json={
+                "user_id": user["user_id"],
+                "code": pyotp.TOTP(user["totp_secret"]).now(),
+            },
+        ),
+    )
+    if response is None or response.status_code != 200:
+        return
+    headers = {"access-token": response.json()["data"]["token"]}
+    workspace_id = user["workspace_id"]
+    project_id = random.choice(user["project_ids"])
+
+    await recorder.call(
+        "workspace.load_initial_data",
+        client.post(f"{API}/load-initial-data", headers=headers),
+    )
+    await recorder.call(
+        "projects.list",
+        client.get(f"{API}/{workspace_id}/projects", headers=headers),
+    )
+    for segment in SECRET_ROUTES:
+        await recorder.call(
+            f"secrets.{segment}",
+            client.get(f"{API}/{workspace_id}/{project_id}/{segment}", headers=headers),
+        )
+    await recorder.call(
+        "dashboard.overview",
+        client.get(
+            f"{API}/{workspace_id}/{project_id}/dashboard/overview", headers=headers
+        ),
+    )
+    await recorder.call(
+        "dashboard.recent_activity",
+        client.get(
+            f"{API}/{workspace_id}/{project_id}/dashboard/recent-activity",
+            headers=headers,
+        ),
+    )
+    await recorder.call(
+        "drive.folder_list",
+        client.get(f"{API}/drive/folder/list", headers=headers),
+    )
+    if user["file_ids"]:
+        file_id = random.choice(user["file_ids"])
+        response = await recorder.call(
+            "drive.download",
+            client.get(f"{API}/drive/file/{file_id}/download", headers=headers),
+            expected=(302,),
+        )
+        if response is not None and response.status_code == 302:
+            await recorder.call("s3.get", client.get(response.headers["location"]))
+
+
+async def drive(base_url, users, sessions, concurrency, recorder):
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency * 2)
+
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=30.0
+    ) as client:
+
+        async def one(n):
+            async with semaphore:
+                await session(client, recorder, users[n % len(users)])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(n) for n in range(sessions)))
+        return time.perf_counter() - started
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+
+    def pick(q):
+        return samples[min(int(len(samples) * q), len(samples) - 1)] * 1e3
+
+    return {
+        "p50_ms": round(pick(0.50), 2),
+        "p95_ms": round(pick(0.95), 2),
+        "p99_ms": round(pick(0.99), 2),
+        "mean_ms": round(statistics.fmean(samples) * 1e3, 2),
+    }
+
+
+def build_report(args, seeded, recorder, elapsed):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    endpoints = {
+        name: {
+            "requests": len(samples),
+            "errors": recorder.errors[name],
+            "throughput_rps": round(len(samples) / elapsed, 1),
+            **percentiles(samples),
+        }
+        for name, samples in recorder.latencies.items()
+    }
+    total = sum(len(samples) for samples in recorder.latencies.values())
+    return {
+        "commit": commit,
+        "config": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("mongo_url", "output", "shapes_dir")
+        },
+        "seeded": seeded,
+        "elapsed_s": round(elapsed, 2),
+        "sessions_per_s": round(args.sessions / elapsed, 1),
+        "requests_per_s": round(total / elapsed, 1),
+        "errors": sum(recorder.errors.values()),
+        "endpoints": endpoints,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017")
+    parser.add_argument("--db-name", default=f"zecrypt_bench_{os.getpid()}")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--projects", type=int, default=2, help="per user")
+    parser.add_argument("--secrets", type=int, default=25, help="per project and type")
+    parser.add_argument("--activity", type=int, default=100, help="per project")
+    parser.add_argument("--folders", type=int, default=20, help="per user")
+    parser.add_argument("--files", type=int, default=50, help="per user")
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20, help="unrecorded sessions")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--keep-db", action="store_true")
+    parser.add_argument("--output", help="also write the JSON report here")
+    args = parser.parse_args()
+    args.shapes_dir = tempfile.mkdtemp(prefix="zecrypt-query-shapes-")
+
+    stubs, stub_url = start_stubs()
+    configure(args, stub_url)
+    users, seeded = asyncio.run(seed(args))
+    server = None
+    query_shapes = None
+    try:
+        server, base_url = start_server(args)
+        recorder = Recorder()
+        recorder.enabled = False
+        asyncio.run(drive(base_url, users, args.warmup, args.concurrency, recorder))
+        recorder.enabled = True
+        elapsed = asyncio.run(
+            drive(base_url, users, args.sessions, args.concurrency, recorder)
+        )
+    finally:
+        if server is not None:
+            # A graceful stop lets every worker write its query shapes.
+            server.terminate()
+            server.wait()
+            query_shapes = asyncio.run(check_query_shapes(args))
+        if not args.keep_db:
+            asyncio.run(drop_database(args))
+        stubs.should_exit = True
+
+    report = build_report(args, seeded, recorder, elapsed)
+    report["query_shapes"] = query_shapes
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    failed = query_shapes["collection_scans"] or query_shapes["unscoped"]
+    return 1 if report["errors"] or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
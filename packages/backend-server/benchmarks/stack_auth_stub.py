@@ -0,0 +1,123 @@
+"""Run Stack Auth token validation against a local stub of /api/v1/users/me.
+
+Starts the stub in-process on a free port, points STACK_AUTH_API_URL at it and
+reports latency percentiles and throughput for cold (new token) and cached
+logins, plus how long a stalled provider can hold a login:
+
+    python -m benchmarks.stack_auth_stub [--requests 2000] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import threading
+import time
+
+import uvicorn
+from app.core.config import settings
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+STUB_DELAY = {"seconds": 0.02}
+
+
+async def users_me(request):
+    await asyncio.sleep(STUB_DELAY["seconds"])
+    token = request.headers.get("x-stack-access-token", "")
+    if token.startswith("bad"):
+        return JSONResponse({"error": "invalid token"}, status_code=401)
+    return JSONResponse(
+        {"id": token, "display_name": "Bench User", "primary_email": "b@example.com"}
+    )
+
+
+def start_stub():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    app = Starlette(routes=[Route("/api/v1/users/me", users_me)])
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+
+    def pick(q):
+        return samples[min(int(len(samples) * q), len(samples) - 1)] * 1e3
+
+    return {
+        "p50_ms": round(pick(0.50), 2),
+        "p95_ms": round(pick(0.95), 2),
+        "p99_ms": round(pick(0.99), 2),
+        "mean_ms": round(statistics.fmean(samples) * 1e3, 2),
+    }
+
+
+async def run(validate, tokens, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one(token):
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            if await validate(token) is None:
+                failures += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(token) for token in tokens))
+    elapsed = time.perf_counter() - started
+    return {
+        **percentiles(latencies),
+        "rps": round(len(tokens) / elapsed, 1),
+        "failures": failures,
+    }
+
+
+async def main(args):
+    from app.api.v1.web.auth.services import stack_auth_cache, validate_stack_auth_token
+    from app.framework.stack_auth import client
+
+    report = {"stub_delay_ms": STUB_DELAY["seconds"] * 1e3}
+    tokens = [f"token-{i}" for i in range(args.requests)]
+    report["cold"] = await run(validate_stack_auth_token, tokens, args.concurrency)
+    report["cached"] = await run(validate_stack_auth_token, tokens, args.concurrency)
+
+    # A provider that never answers is cut off by the client timeout.
+    stack_auth_cache.clear()
+    STUB_DELAY["seconds"] = settings.STACK_AUTH_TIMEOUT_SECONDS + 5
+    started = time.perf_counter()
+    result = await validate_stack_auth_token("stalled")
+    report["stalled"] = {
+        "result": result,
+        "elapsed_s": round(time.perf_counter() - started, 2),
+        "timeout_s": settings.STACK_AUTH_TIMEOUT_SECONDS,
+    }
+    await client.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.STACK_AUTH_MAX_CONNECTIONS
+    )
+    args = parser.parse_args()
+
+    server, url = start_stub()
+    settings.STACK_AUTH_API_URL = url
+    settings.STACK_AUTH_TIMEOUT_SECONDS = 2.0
+    asyncio.run(main(args))
+    server.should_exit = True
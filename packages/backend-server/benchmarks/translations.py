@@ -0,0 +1,67 @@
+"""Startup and lookup cost of the nested translation dicts translate() used to
+walk versus the compiled flat tables in app.utils.i8ns.
+
+    python -m benchmarks.translations
+"""
+
+import json
+import time
+import timeit
+
+from app.utils import i8ns
+
+LOOKUPS = 200_000
+KEYS = ["card.add", "pagination.invalid_cursor", "drive.files.already_exists"]
+
+
+def load_nested():
+    """The previous load_translations: parse every locale at import."""
+    translations = {}
+    for file in i8ns.LOCALES_DIR.glob("*.json"):
+        with open(file, "r", encoding="utf-8") as f:
+            translations[file.stem] = json.load(f)
+    return translations
+
+
+def translate_nested(translations, lang, key):
+    """The previous translate: split the key and walk the nested dicts."""
+    current = translations.get(lang, {})
+    for part in key.split("."):
+        if isinstance(current, dict):
+            current = current.get(part)
+        else:
+            return key
+    return current or key
+
+
+def timed(func, repeat=20):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    print(f"{'nested startup':>18}: {timed(load_nested) * 1e3:8.2f} ms")
+    print(f"{'compiled startup':>18}: {timed(i8ns.load_translations) * 1e3:8.2f} ms")
+    first_use = timed(lambda: (i8ns.load_translations(), i8ns.get_translations("de")))
+    print(f"{'+ first de lookup':>18}: {first_use * 1e3:8.2f} ms")
+
+    nested = load_nested()
+    i8ns.request_language.set("de")
+
+    def old():
+        for key in KEYS:
+            translate_nested(nested, "de", key)
+
+    def new():
+        for key in KEYS:
+            i8ns.translate(key)
+
+    for name, func in (("nested lookup", old), ("compiled lookup", new)):
+        seconds = timeit.timeit(func, number=LOOKUPS)
+        print(f"{name:>18}: {seconds / (LOOKUPS * len(KEYS)) * 1e9:8.1f} ns/call")
+
+
+if __name__ == "__main__":
+    main()
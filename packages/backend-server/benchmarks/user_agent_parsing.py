@@ -0,0 +1,84 @@
+"""Compare user_agents.parse with the memoized parser used for login events.
+
+Replays a login stream drawn from a corpus of common User-Agent strings with a
+skewed (Zipf-like) popularity, as real login traffic is:
+
+    python -m benchmarks.user_agent_parsing [--logins 20000]
+"""
+
+import argparse
+import random
+import time
+
+from app.utils.user_agent import login_activity_fields, parse_user_agent
+from user_agents import parse
+
+CORPUS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Safari/605.1.15",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.6367.82 Mobile Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 Edg/124.0.0.0",
+    "Mozilla/5.0 (Linux; Android 13; SM-S918B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.6312.118 Mobile Safari/537.36",
+    "Mozilla/5.0 (iPad; CPU OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 16_7_7 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) CriOS/124.0.6367.88 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14.4; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 OPR/109.0.0.0",
+    "Mozilla/5.0 (Linux; Android 12; moto g(60)) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (Linux; Android 14; SM-X710) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Zecrypt/2.3.1 (Macintosh; Intel Mac OS X 14_4) Electron/29.3.0",
+    "Zecrypt/2.3.1 (Windows NT 10.0; Win64; x64) Electron/29.3.0",
+    "okhttp/4.12.0",
+    "python-requests/2.31.0",
+]
+
+
+def login_stream(count, seed=7):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(CORPUS))]
+    return rng.choices(CORPUS, weights=weights, k=count)
+
+
+def raw_fields(user_agent):
+    """The per-login work record_login_event used to do."""
+    ua = parse(user_agent)
+    return {
+        "browser": ua.browser.family,
+        "os": f"{ua.os.family} {ua.os.version_string}",
+        "device": {
+            "type": ua.device.family,
+            "is_mobile": ua.is_mobile,
+            "is_tablet": ua.is_tablet,
+            "is_pc": ua.is_pc,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=20000)
+    args = parser.parse_args()
+    stream = login_stream(args.logins)
+
+    for user_agent in CORPUS:
+        assert raw_fields(user_agent) == login_activity_fields(user_agent)
+
+    parse_user_agent.cache_clear()
+    for name, func in (
+        ("user_agents.parse", raw_fields),
+        ("memoized", login_activity_fields),
+    ):
+        started = time.perf_counter()
+        for user_agent in stream:
+            func(user_agent)
+        elapsed = time.perf_counter() - started
+        print(f"{name:>17}: {elapsed / len(stream) * 1e6:8.2f} us/login")
+    print(f"{'cache':>17}: {parse_user_agent.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
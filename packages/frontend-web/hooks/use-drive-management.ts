@@ -34,7 +34,6 @@ interface DriveFile {
   workspace_id: string;
   project_id: string;
   encrypted_data?: string; // base64 encoded encrypted blob (from API)
-  download_url?: string; // presigned URL from Digital Ocean
 }
 
 interface UseDriveManagementProps {
@@ -70,6 +69,18 @@ interface UseDriveManagementReturn {
   downloadProgress: string;
 }
 
+// Listings carry no download links; ask for a signed URL when a file is needed.
+async function fetchDownloadUrl(fileId: string): Promise<string> {
+  const response = await axiosInstance.get(`/drive/file/${fileId}/download`, {
+    params: { redirect: false },
+  });
+  const downloadUrl = response.data?.data?.download_url;
+  if (!downloadUrl) {
+    throw new Error("Download URL not available");
+  }
+  return downloadUrl;
+}
+
 export function useDriveManagement({
   selectedWorkspaceId,
   selectedProjectId,
@@ -157,7 +168,6 @@ export function useDriveManagement({
           workspace_id: file.workspace_id || selectedWorkspaceId,
           project_id: file.project_id || selectedProjectId,
           encrypted_data: file.data,
-          download_url: file.file_url, // file_url is directly the URL string
         };
       });
       
@@ -980,15 +990,6 @@ export function useDriveManagement({
       return;
     }
 
-    if (!file.download_url) {
-      toast({
-        title: translate("error", "drive", { default: "Error" }),
-        description: translate("download_url_missing", "drive", { default: "Download URL not available" }),
-        variant: "destructive",
-      });
-      return;
-    }
-
     setIsDownloading(true);
     try {
       // Get project info for key lookup
@@ -1013,8 +1014,9 @@ export function useDriveManagement({
         description: file.name,
       });
 
+      const downloadUrl = await fetchDownloadUrl(file.file_id);
       await decryptAndDownloadFile(
-        file.download_url,
+        downloadUrl,
         file.name,
         file.type,
         file.iv,
@@ -1092,10 +1094,9 @@ export function useDriveManagement({
         });
 
         try {
-          if (!file.download_url) continue;
-          
           // Download and decrypt
-          const encryptedBlob = await downloadFileFromUrl(file.download_url);
+          const downloadUrl = await fetchDownloadUrl(file.file_id);
+          const encryptedBlob = await downloadFileFromUrl(downloadUrl);
           const decryptedBlob = await decryptFileBlob(encryptedBlob, file.iv, projectKey);
           
           // Add to zip with proper path
@@ -1146,15 +1147,6 @@ export function useDriveManagement({
       return null;
     }
 
-    if (!file.download_url) {
-      toast({
-        title: translate("error", "drive", { default: "Error" }),
-        description: translate("download_url_missing", "drive", { default: "Download URL not available" }),
-        variant: "destructive",
-      });
-      return null;
-    }
-
     try {
       // Get project info for key lookup
       const currentProject = workspaces
@@ -1174,7 +1166,8 @@ export function useDriveManagement({
       }
 
       // Download encrypted file
-      const encryptedBlob = await downloadFileFromUrl(file.download_url);
+      const downloadUrl = await fetchDownloadUrl(file.file_id);
+      const encryptedBlob = await downloadFileFromUrl(downloadUrl);
       
       // Decrypt the file
       const decryptedBlob = await decryptFileBlob(encryptedBlob, file.iv, projectKey);